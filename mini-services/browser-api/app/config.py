@@ -0,0 +1,89 @@
+"""
+Service configuration loaded from environment variables.
+"""
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Runtime settings (override via environment or .env file)."""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Comma-separated hostnames exempt from SSRF blocking (e.g. benchmark fixtures)
+    ssrf_allowed_hosts: str = ""
+
+    # Browser contexts pre-created at startup and kept warm
+    warm_contexts: int = 2
+
+    # Size (characters) of artifact chunks sent by streaming endpoints
+    stream_chunk_size: int = 65536
+
+    # Server-side retries of transient failures (classes: dns, connection, crash, timeout)
+    retry_max_retries: int = 1
+    retry_on: str = "dns,connection,crash,timeout"
+    retry_backoff_ms: int = 200
+    retry_backoff_max_ms: int = 2000
+    retry_min_budget_ms: int = 2000  # do not retry with less deadline left than this
+    retry_proxy_pool: str = ""  # comma-separated proxies retries rotate through
+
+    # Hedged requests: per-domain latency window used for the p95 trigger
+    hedge_latency_window: int = 200
+    hedge_min_samples: int = 20
+
+    # Extra time allowed to snapshot a best-effort partial result after the deadline
+    best_effort_grace_ms: int = 1000
+
+    # Network waterfall entries kept per request with capture_performance
+    performance_max_entries: int = 500
+
+    # Result cache (opt-in per request via cache_ttl) and background warming
+    cache_max_mb: int = 256
+    cache_warm_targets_path: str = ""  # JSON list of {url, refresh_s, template}
+    cache_warm_tick_s: float = 1.0
+    cache_refresh_ahead_s: float = 10.0  # refresh this long before expiry
+    cache_warm_min_free_slots: int = 2  # only warm when this many slots are free
+    cache_learn_min_hits: int = 5  # hits within the window that make a URL a warm target
+    cache_learn_window_s: float = 600.0
+    cache_learn_idle_s: float = 3600.0  # drop learned targets not requested for this long
+    cache_learn_max_targets: int = 100
+    cache_warm_max_targets: int = 100  # configured + API targets
+    cache_warm_max_targets_per_tenant: int = 10  # API targets per API key
+    cache_warm_min_api_refresh_s: int = 300  # shortest refresh_s for API targets
+
+    # Change monitor fingerprints kept in memory (LRU) and probe timeout
+    monitor_max_mb: int = 64
+    monitor_probe_timeout_ms: int = 5000
+
+    # Per-target-domain politeness
+    domain_max_concurrency: int = 2
+    domain_min_interval_ms: int = 500
+    domain_max_retry_after_s: int = 300
+
+    # Tenants: JSON or SQLite snapshot of api_keys/subscriptions/plans
+    tenant_snapshot_path: str = ""
+    default_plan: str = "free"
+    anonymous_max_concurrency: int = 3
+
+    # Write-behind usage recording (sqlite:///path or postgresql://...)
+    usage_database_url: str = "sqlite:////tmp/browser-api/usage.db"
+    usage_buffer_size: int = 10000
+    usage_flush_interval_s: float = 5.0
+    usage_flush_batch_size: int = 500
+    usage_spill_path: str = "/tmp/browser-api/usage-spill.jsonl"
+    usage_dead_letter_path: str = "/tmp/browser-api/usage-dead-letter.jsonl"
+
+    # Cluster mode: nodes register with CLUSTER_COORDINATOR_URL, advertising
+    # CLUSTER_NODE_URL (the address the coordinator uses to reach them)
+    cluster_coordinator_url: str = ""
+    cluster_node_url: str = ""
+    cluster_heartbeat_s: float = 5.0
+    cluster_node_ttl_s: float = 15.0
+    cluster_poll_interval_s: float = 1.0
+    cluster_virtual_nodes: int = 128
+    # Shared secret nodes send in X-Cluster-Secret to (de)register; without
+    # one the coordinator only accepts nodes registering from loopback
+    cluster_secret: str = ""
+    cluster_coordinator_host: str = "127.0.0.1"
+
+
+settings = Settings()
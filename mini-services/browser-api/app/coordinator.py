@@ -0,0 +1,244 @@
+"""
+Browser API Cluster Coordinator.
+Routes API requests across registered browser-api nodes by target domain.
+
+Run alongside the nodes, e.g.:
+
+    uvicorn app.coordinator:app --port 9000
+"""
+import hmac
+import ipaddress
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+import orjson
+import structlog
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .config import settings
+from .models.schemas import ClusterNodeRegistration, ClusterNodeStatus, ErrorResponse
+from .services.cluster import CLUSTER_SECRET_HEADER, Cluster, NodeState
+from .services.scheduler import registered_domain
+
+logger = structlog.get_logger()
+
+# Headers that must not be forwarded between hops
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host", "content-length",
+    CLUSTER_SECRET_HEADER.lower(),
+}
+
+# Set by the coordinator's own server on the way out
+SERVER_HEADERS = {"date", "server"}
+
+# Attempts per request when a node cannot be reached (the body is buffered, so retrying is safe)
+MAX_ROUTE_ATTEMPTS = 2
+
+cluster = Cluster()
+_proxy_client: Optional[httpx.AsyncClient] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start health polling and the shared proxy client."""
+    global _proxy_client
+    logger.info("Starting Browser API cluster coordinator...")
+    # Renders can take minutes; only connecting is bounded
+    _proxy_client = httpx.AsyncClient(timeout=httpx.Timeout(None, connect=5.0))
+    await cluster.start()
+
+    yield
+
+    logger.info("Shutting down cluster coordinator...")
+    await cluster.stop()
+    await _proxy_client.aclose()
+
+
+app = FastAPI(
+    title="Browser API Cluster Coordinator",
+    description="Routes Browser API requests across nodes with domain affinity.",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+
+def _error(status_code: int, error_code: str, message: str, details: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content=jsonable_encoder(
+            ErrorResponse(status="error", error_code=error_code, message=message, details=details)
+        ),
+    )
+
+
+def _routing_key(request: Request, body: bytes) -> Optional[str]:
+    """Target domain of a request: `url` query param, or `url`/first seed in a JSON body."""
+    url = request.query_params.get("url")
+    if url is None and body:
+        try:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            payload = None
+        if isinstance(payload, dict):
+            url = payload.get("url") or next(iter(payload.get("seeds") or []), None)
+    if not isinstance(url, str):
+        return None
+    return registered_domain(url) or None
+
+
+def _is_loopback(host: Optional[str]) -> bool:
+    try:
+        return ipaddress.ip_address(host or "").is_loopback
+    except ValueError:
+        return False
+
+
+async def verify_node(request: Request) -> None:
+    """
+    Only nodes may (de)register: they receive proxied customer requests,
+    API keys included. Requires CLUSTER_SECRET when one is configured,
+    otherwise only loopback clients are accepted.
+    """
+    if settings.cluster_secret:
+        sent = request.headers.get(CLUSTER_SECRET_HEADER, "")
+        if hmac.compare_digest(sent.encode(), settings.cluster_secret.encode()):
+            return
+    elif _is_loopback(request.client.host if request.client else None):
+        return
+    logger.warning(f"Rejected cluster registration from {request.client.host if request.client else '?'}")
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=ErrorResponse(
+            status="error",
+            error_code="FORBIDDEN",
+            message=f"Missing or invalid {CLUSTER_SECRET_HEADER}",
+        ).model_dump(),
+    )
+
+
+@app.post(
+    "/cluster/nodes",
+    response_model=ClusterNodeStatus,
+    dependencies=[Depends(verify_node)],
+    tags=["Cluster"],
+)
+async def register_node(registration: ClusterNodeRegistration) -> ClusterNodeStatus:
+    """Register a node, or refresh its heartbeat."""
+    return cluster.register(registration.url).status()
+
+
+@app.delete(
+    "/cluster/nodes",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(verify_node)],
+    tags=["Cluster"],
+)
+async def deregister_node(registration: ClusterNodeRegistration) -> None:
+    """Remove a node from the cluster (sent by nodes on shutdown)."""
+    cluster.deregister(registration.url)
+
+
+@app.get("/cluster/nodes", response_model=list[ClusterNodeStatus], tags=["Cluster"])
+async def list_nodes() -> list[ClusterNodeStatus]:
+    """Registered nodes with their last polled slot data."""
+    return [node.status() for node in cluster.nodes]
+
+
+@app.get("/health", tags=["Health"])
+async def health():
+    """Liveness check for the coordinator itself."""
+    return {"status": "ok"}
+
+
+@app.get("/ready", tags=["Health"])
+async def ready():
+    """Ready once at least one node is routable."""
+    healthy = sum(1 for node in cluster.nodes if node.healthy)
+    if not healthy:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "ready": False, "healthy_nodes": 0},
+        )
+    return {"status": "ready", "ready": True, "healthy_nodes": healthy}
+
+
+class _RelayResponse(StreamingResponse):
+    """
+    Streams an upstream node response to the client. The node's in-flight
+    slot and the upstream connection are released however the response
+    ends - including a client that disconnects before the body is iterated,
+    when a generator's finally would never run.
+    """
+
+    def __init__(self, content, upstream: httpx.Response, node: NodeState, **kwargs):
+        super().__init__(content, **kwargs)
+        self._upstream = upstream
+        self._node = node
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._node.in_flight -= 1
+            await self._upstream.aclose()
+
+
+@app.api_route("/api/v1/{path:path}", methods=["GET", "POST", "DELETE"], include_in_schema=False)
+async def proxy(path: str, request: Request):
+    """Forward an API request to the node chosen by domain affinity."""
+    body = await request.body()
+    routing_key = _routing_key(request, body)
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
+    tried: set[str] = set()
+    for _ in range(MAX_ROUTE_ATTEMPTS):
+        node = cluster.pick(routing_key, exclude=frozenset(tried))
+        if node is None:
+            break
+        tried.add(node.url)
+
+        upstream = _proxy_client.build_request(
+            request.method,
+            f"{node.url}/api/v1/{path}",
+            params=request.query_params,
+            headers=headers,
+            content=body,
+        )
+        node.in_flight += 1
+        try:
+            response = await _proxy_client.send(upstream, stream=True)
+        except httpx.TransportError as e:
+            node.in_flight -= 1
+            cluster.mark_failed(node)
+            logger.warning(f"Node {node.url} unreachable, rerouting: {e}")
+            continue
+
+        response_headers = {
+            k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS | SERVER_HEADERS
+        }
+        response_headers["X-Cluster-Node"] = node.url
+        # Streams SSE endpoints through unbuffered
+        return _RelayResponse(
+            response.aiter_raw(),
+            upstream=response,
+            node=node,
+            status_code=response.status_code,
+            headers=response_headers,
+        )
+
+    return _error(
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        "NO_NODES_AVAILABLE",
+        "No healthy browser-api node is available",
+        details={"routing_key": routing_key, "tried": sorted(tried)},
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("app.coordinator:app", host=settings.cluster_coordinator_host, port=9000, log_level="info")
@@ -15,6 +15,10 @@ import orjson
 
 from .routes import router as api_router
 from .services.browser import browser_manager
+from .services.cache import cache_warmer
+from .services.cluster import cluster_member
+from .services.tenants import tenant_registry
+from .services.usage import usage_recorder
 from .models.schemas import ErrorResponse
 
 # Configure structured logging
@@ -49,17 +53,36 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Browser API Service...")
     
     try:
-        # Pre-initialize browser manager
-        await browser_manager.initialize()
-        logger.info("Browser manager initialized successfully")
+        tenant_registry.load()
     except Exception as e:
-        logger.error(f"Failed to initialize browser manager: {e}")
-        # Continue anyway - browser will be initialized on first request
+        logger.error(f"Failed to load tenant snapshot: {e}")
+        # Continue anyway - without a snapshot every request, keyed or not,
+        # is scheduled on the shared anonymous queue
+    
+    await usage_recorder.start()
+    
+    try:
+        cache_warmer.load()
+    except Exception as e:
+        logger.error(f"Failed to load cache warming targets: {e}")
+    await cache_warmer.start()
+    
+    # Launch the browser and pre-warm contexts in the background;
+    # /ready reports false until this completes
+    warm_up_task = asyncio.create_task(browser_manager.warm_up())
+    
+    # Join the cluster if configured; the coordinator only routes here
+    # once /api/v1/health reports the node healthy
+    await cluster_member.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down Browser API Service...")
+    await cluster_member.stop()
+    await cache_warmer.stop()
+    warm_up_task.cancel()
+    await usage_recorder.stop()
     await browser_manager.shutdown()
     logger.info("Browser manager shutdown complete")
 
@@ -163,6 +186,7 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs",
         "health": "/api/v1/health",
+        "ready": "/ready",
     }
 
 
@@ -173,10 +197,26 @@ app.include_router(api_router)
 # Health check at root level for load balancers
 @app.get("/health", tags=["Health"])
 async def root_health():
-    """Simple health check for load balancers."""
+    """Simple liveness check for load balancers."""
     return {"status": "ok"}
 
 
+# Readiness check - false until the browser is launched and warmed up
+@app.get("/ready", tags=["Health"])
+async def root_ready():
+    """Readiness check: 503 until browser warm-up has completed."""
+    if not browser_manager.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "ready": False},
+        )
+    return {
+        "status": "ready",
+        "ready": True,
+        "cold_start_ms": browser_manager.cold_start_ms,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     
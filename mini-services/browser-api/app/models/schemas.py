@@ -51,7 +51,7 @@ class BrowseRequest(BaseModel):
         default=30000,
         ge=1000,
         le=60000,
-        description="Request timeout in milliseconds (1000-60000)"
+        description="End-to-end deadline in milliseconds, including queueing (1000-60000)"
     )
     viewport_width: int = Field(
         default=1920,
@@ -77,6 +77,34 @@ class BrowseRequest(BaseModel):
         default=None,
         description="Additional HTTP headers to send"
     )
+    extract_links: bool = Field(
+        default=False,
+        description="Return the absolute URLs of all links on the page"
+    )
+    capture_performance: bool = Field(
+        default=False,
+        description="Return a network waterfall and Chromium performance metrics"
+    )
+    best_effort: bool = Field(
+        default=False,
+        description="If the timeout hits after navigation, return what was captured so far"
+    )
+    max_retries: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=3,
+        description="Server-side retries of transient failures (default from RETRY_MAX_RETRIES)"
+    )
+    hedge: bool = Field(
+        default=False,
+        description="Start a second attempt if the first exceeds the domain's p95 latency"
+    )
+    cache_ttl: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=86400,
+        description="Accept a cached result up to this many seconds old, and cache this result as long"
+    )
 
     @field_validator('url')
     @classmethod
@@ -97,28 +125,219 @@ class BrowseRequest(BaseModel):
         return v
 
 
+class CrawlRequest(BaseModel):
+    """Request model for crawl endpoint."""
+    seeds: list[str] = Field(..., min_length=1, max_length=100, description="Seed URLs to start from")
+    same_domain: bool = Field(
+        default=True,
+        description="Only follow links on the seeds' registered domains"
+    )
+    include_patterns: list[str] = Field(
+        default_factory=list,
+        description="Regexes; if set, a URL must match at least one to be crawled"
+    )
+    exclude_patterns: list[str] = Field(
+        default_factory=list,
+        description="Regexes; URLs matching any of these are skipped"
+    )
+    max_depth: int = Field(default=2, ge=0, le=10, description="Maximum link depth from the seeds")
+    max_pages: int = Field(default=50, ge=1, le=5000, description="Page budget for the crawl")
+    concurrency: int = Field(default=2, ge=1, le=10, description="Pages rendered in parallel")
+    action: ActionType = Field(default=ActionType.RENDER, description="Action to perform on each page")
+    wait_for: Optional[Union[str, int]] = Field(
+        default=None,
+        description="CSS selector to wait for, or time in milliseconds"
+    )
+    timeout: int = Field(default=30000, ge=1000, le=60000, description="Per-page timeout in milliseconds")
+    proxy_config: Optional[ProxyConfig] = Field(default=None, description="Optional proxy configuration")
+    user_agent: Optional[str] = Field(default=None, description="Custom user agent string")
+    headers: Optional[dict[str, str]] = Field(default=None, description="Additional HTTP headers to send")
+
+    @field_validator('seeds')
+    @classmethod
+    def validate_seeds(cls, v: list[str]) -> list[str]:
+        for seed in v:
+            BrowseRequest.validate_url(seed)
+        return v
+
+    @field_validator('include_patterns', 'exclude_patterns')
+    @classmethod
+    def validate_patterns(cls, v: list[str]) -> list[str]:
+        for pattern in v:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid regex '{pattern}': {e}")
+        return v
+
+
+class NetworkTimings(BaseModel):
+    """HAR-style phase timings of one request in ms (-1 = not applicable)."""
+    dns: float = Field(-1, description="DNS lookup")
+    connect: float = Field(-1, description="TCP connect (includes TLS)")
+    ssl: float = Field(-1, description="TLS handshake")
+    wait: float = Field(-1, description="Time to first byte after the request was sent")
+    receive: float = Field(-1, description="Response body download")
+
+
+class NetworkEntry(BaseModel):
+    """One subresource in the request waterfall."""
+    url: str = Field(..., description="Request URL (truncated)")
+    method: str = Field(..., description="HTTP method")
+    resource_type: str = Field(..., description="Resource type (document, script, xhr, ...)")
+    status: Optional[int] = Field(None, description="Response status (None if the request failed)")
+    started_ms: float = Field(..., description="Start time relative to the first request")
+    duration_ms: float = Field(..., description="Time until the response finished (-1 if unknown)")
+    timings: NetworkTimings = Field(default_factory=NetworkTimings, description="Phase timings")
+    request_bytes: Optional[int] = Field(None, description="Request headers + body size")
+    response_bytes: Optional[int] = Field(None, description="Response headers + body size")
+    failure: Optional[str] = Field(None, description="Failure reason for failed requests")
+
+
+class PerformanceMetrics(BaseModel):
+    """Chromium performance counters (CDP Performance.getMetrics)."""
+    script_duration_ms: float = Field(..., description="Time spent executing JavaScript")
+    layout_duration_ms: float = Field(..., description="Time spent in layout")
+    recalc_style_duration_ms: float = Field(..., description="Time spent recalculating styles")
+    task_duration_ms: float = Field(..., description="Total main-thread task time")
+    js_heap_used_mb: float = Field(..., description="Used JavaScript heap")
+    js_heap_total_mb: float = Field(..., description="Total JavaScript heap")
+    dom_nodes: int = Field(..., description="Live DOM nodes")
+    documents: int = Field(..., description="Live documents (including frames)")
+    layout_count: int = Field(..., description="Number of layouts")
+    dom_content_loaded_ms: Optional[float] = Field(
+        None, description="DOMContentLoaded relative to navigation start"
+    )
+
+
+class PerformanceCapture(BaseModel):
+    """Network waterfall and performance metrics of a browse request."""
+    entries: list[NetworkEntry] = Field(default_factory=list, description="Request waterfall")
+    dropped_entries: int = Field(0, description="Requests not recorded because of the entry cap")
+    metrics: Optional[PerformanceMetrics] = Field(None, description="Chromium performance metrics")
+
+
 class BrowseResponse(BaseModel):
     """Success response model for browse endpoint."""
-    status: str = Field(default="success", description="Response status")
+    status: str = Field(default="success", description="Response status (success/partial)")
     url: str = Field(..., description="Requested URL")
     final_url: Optional[str] = Field(None, description="Final URL after redirects")
     content: Optional[str] = Field(None, description="HTML content (for render action)")
     screenshot: Optional[str] = Field(None, description="Base64 encoded screenshot (for screenshot action)")
     pdf: Optional[str] = Field(None, description="Base64 encoded PDF (for pdf action)")
     content_type: Optional[str] = Field(None, description="Content type of response")
+    status_code: Optional[int] = Field(None, description="HTTP status of the navigation response")
     page_title: Optional[str] = Field(None, description="Page title")
+    links: Optional[list[str]] = Field(None, description="Links found on the page (if extract_links)")
+    performance: Optional[PerformanceCapture] = Field(
+        None, description="Network waterfall and metrics (if capture_performance)"
+    )
+    timed_out_during: Optional[str] = Field(
+        None, description="Phase the deadline ran out in (partial results only)"
+    )
+    cached: bool = Field(default=False, description="Served from the result cache")
+    cache_age_s: Optional[float] = Field(None, description="Age of the cached result in seconds")
+    execution_time_ms: float = Field(..., description="Total execution time in milliseconds")
+
+
+class MonitorRequest(BaseModel):
+    """Request model for monitor endpoint."""
+    url: str = Field(..., description="URL to check for changes")
+    wait_for: Optional[Union[str, int]] = Field(
+        default=None,
+        description="CSS selector to wait for, or time in milliseconds"
+    )
+    execute_js: Optional[str] = Field(default=None, description="JavaScript code to execute before capture")
+    timeout: int = Field(default=30000, ge=1000, le=60000, description="Request timeout in milliseconds")
+    proxy_config: Optional[ProxyConfig] = Field(default=None, description="Optional proxy configuration")
+    user_agent: Optional[str] = Field(default=None, description="Custom user agent string")
+    headers: Optional[dict[str, str]] = Field(default=None, description="Additional HTTP headers to send")
+    max_diff_lines: int = Field(default=200, ge=1, le=5000, description="Maximum diff lines returned")
+
+    @field_validator('url')
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        return BrowseRequest.validate_url(v)
+
+
+class MonitorResponse(BaseModel):
+    """Response model for monitor endpoint."""
+    status: str = Field(..., description="new, unchanged or changed")
+    url: str = Field(..., description="Requested URL")
+    final_url: Optional[str] = Field(None, description="Final URL after redirects (rendered checks)")
+    checked_via: str = Field(..., description="conditional (ETag/Last-Modified 304) or render")
+    content_hash: str = Field(..., description="SHA-256 of the extracted text")
+    simhash: str = Field(..., description="64-bit SimHash of the extracted text (hex)")
+    similarity: Optional[float] = Field(None, description="SimHash similarity to the previous version (0-1)")
+    diff: Optional[str] = Field(None, description="Unified diff of the extracted text (when changed)")
+    diff_truncated: bool = Field(default=False, description="Whether the diff was cut at max_diff_lines")
+    status_code: Optional[int] = Field(None, description="HTTP status of the navigation response")
+    page_title: Optional[str] = Field(None, description="Page title (rendered checks)")
     execution_time_ms: float = Field(..., description="Total execution time in milliseconds")
 
 
 class HealthResponse(BaseModel):
     """Health check response model."""
-    status: str = Field(default="healthy", description="Service health status")
+    status: str = Field(default="healthy", description="Service health status (healthy/degraded)")
     active_contexts: int = Field(..., description="Number of active browser contexts")
     available_slots: int = Field(..., description="Available browser slots")
     memory_usage_mb: Optional[float] = Field(None, description="Current memory usage in MB")
+    browser_memory_usage_mb: Optional[float] = Field(
+        None, description="Combined memory usage of Playwright/Chromium child processes in MB"
+    )
     uptime_seconds: float = Field(..., description="Service uptime in seconds")
 
 
+class WarmTargetRequest(BaseModel):
+    """A URL to keep warm in the result cache."""
+    url: str = Field(..., description="URL to keep warm")
+    refresh_s: int = Field(..., ge=10, le=86400, description="Refresh interval (cache TTL) in seconds")
+    template: dict[str, Any] = Field(
+        default_factory=dict,
+        description="Browse options used for the render (action, wait_for, viewport_width, ...)"
+    )
+
+
+class WarmEntryStatus(BaseModel):
+    """Freshness of one warmed cache entry."""
+    key: str = Field(..., description="Cache key")
+    url: str = Field(..., description="Warmed URL")
+    action: str = Field(..., description="Render action")
+    source: str = Field(..., description="configured, api or learned")
+    refresh_s: int = Field(..., description="Refresh interval in seconds")
+    fresh: bool = Field(..., description="Whether a non-expired result is cached")
+    age_s: Optional[float] = Field(None, description="Age of the cached result")
+    expires_in_s: Optional[float] = Field(None, description="Seconds until the cached result expires")
+    refreshes: int = Field(0, description="Successful background refreshes")
+    failures: int = Field(0, description="Failed background refreshes")
+    last_error: Optional[str] = Field(None, description="Error of the last failed refresh")
+    last_render_ms: Optional[float] = Field(None, description="Duration of the last refresh render")
+
+
+class ClusterNodeRegistration(BaseModel):
+    """Node registration/heartbeat sent to the cluster coordinator."""
+    url: str = Field(..., description="Base URL the coordinator uses to reach the node")
+
+    @field_validator('url')
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        if not v.startswith(('http://', 'https://')):
+            raise ValueError('Node URL must start with http:// or https://')
+        return v.rstrip('/')
+
+
+class ClusterNodeStatus(BaseModel):
+    """Coordinator view of a registered node."""
+    url: str = Field(..., description="Node base URL")
+    healthy: bool = Field(..., description="Whether the node is currently routable")
+    active_contexts: int = Field(..., description="Active contexts reported by the node")
+    available_slots: int = Field(..., description="Available slots reported by the node")
+    in_flight: int = Field(..., description="Requests the coordinator has in flight on the node")
+    routed: int = Field(..., description="Requests routed to the node as domain owner")
+    spilled: int = Field(..., description="Requests routed to the node as spillover")
+    last_heartbeat_s: float = Field(..., description="Seconds since the last registration heartbeat")
+
+
 class ErrorResponse(BaseModel):
     """Error response model."""
     status: str = Field(default="error", description="Response status")
@@ -127,11 +346,48 @@ class ErrorResponse(BaseModel):
     details: Optional[dict[str, Any]] = Field(None, description="Additional error details")
 
 
+class TenantMetrics(BaseModel):
+    """Per-tenant scheduling metrics."""
+    key_prefix: str = Field(..., description="API key prefix (not unique)")
+    plan: str = Field(..., description="Plan tier of the tenant")
+    queue_depth: int = Field(..., description="Requests waiting for a browser slot")
+    active: int = Field(..., description="Browser slots currently held")
+    served: int = Field(..., description="Requests admitted so far")
+    average_wait_ms: float = Field(..., description="Average queue wait time")
+    max_wait_ms: float = Field(..., description="Longest queue wait time")
+
+
 class MetricsResponse(BaseModel):
     """Metrics response for monitoring."""
     total_requests: int = Field(..., description="Total number of requests served")
     successful_requests: int = Field(..., description="Successful requests count")
     failed_requests: int = Field(..., description="Failed requests count")
+    partial_requests: int = Field(0, description="Best-effort partial results returned after a timeout")
+    retries: dict[str, int] = Field(
+        default_factory=dict, description="Server-side retries by error class"
+    )
+    hedged_requests: int = Field(0, description="Requests that started a hedged second attempt")
+    hedge_wins: int = Field(0, description="Hedged attempts that finished first")
+    cache: dict[str, int] = Field(
+        default_factory=dict,
+        description="Result cache counters (hits, misses, entries, bytes, evictions, warm_targets)"
+    )
     average_response_time_ms: float = Field(..., description="Average response time")
     active_contexts: int = Field(..., description="Current active browser contexts")
     queued_requests: int = Field(..., description="Requests waiting in queue")
+    warm_contexts: int = Field(0, description="Pre-warmed browser contexts ready for use")
+    cold_start_ms: Optional[float] = Field(
+        None, description="Time from process start until browser warm-up completed"
+    )
+    throttled_domains: dict[str, float] = Field(
+        default_factory=dict,
+        description="Target domains backing off after 429/503, with seconds remaining"
+    )
+    tenants: dict[str, TenantMetrics] = Field(
+        default_factory=dict,
+        description="Queue metrics per tenant (API key id)"
+    )
+    usage: dict[str, int] = Field(
+        default_factory=dict,
+        description="Usage recorder counters (recorded, buffered, flushed, spilled, dropped)"
+    )
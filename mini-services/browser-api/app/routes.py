@@ -1,21 +1,35 @@
 """
 API Routes for Browser Service.
 """
+import asyncio
+import contextlib
 import time
-from typing import Any
+from typing import Any, AsyncIterator, Optional, Union
 
+import orjson
 import structlog
-from fastapi import APIRouter, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from .config import settings
 from .models.schemas import (
     BrowseRequest,
     BrowseResponse,
+    CrawlRequest,
     ErrorResponse,
     HealthResponse,
     MetricsResponse,
+    MonitorRequest,
+    MonitorResponse,
+    WarmEntryStatus,
+    WarmTargetRequest,
 )
 from .services.browser import browser_manager
+from .services.cache import WarmTargetLimitError, cache_warmer, result_cache
+from .services.crawler import Crawler
+from .services.monitor import change_monitor
+from .services.tenants import ANONYMOUS_TENANT_ID, UNKNOWN_KEY_TENANT_ID, Tenant, tenant_registry
+from .services.usage import usage_recorder
 
 logger = structlog.get_logger()
 
@@ -35,15 +49,24 @@ async def health_check() -> HealthResponse:
     """
     try:
         import psutil
-        memory_usage = psutil.Process().memory_info().rss / 1024 / 1024
+        process = psutil.Process()
+        memory_usage = process.memory_info().rss / 1024 / 1024
+        browser_memory_usage = 0.0
+        for child in process.children(recursive=True):
+            try:
+                browser_memory_usage += child.memory_info().rss / 1024 / 1024
+            except psutil.Error:
+                pass
     except ImportError:
         memory_usage = None
+        browser_memory_usage = None
     
     return HealthResponse(
-        status="healthy",
+        status="healthy" if browser_manager.ready else "degraded",
         active_contexts=browser_manager.active_contexts,
         available_slots=browser_manager.available_slots,
         memory_usage_mb=memory_usage,
+        browser_memory_usage_mb=browser_memory_usage,
         uptime_seconds=browser_manager.uptime,
     )
 
@@ -59,7 +82,11 @@ async def get_metrics() -> MetricsResponse:
     Get service metrics including request counts and performance data.
     """
     metrics = browser_manager.metrics
-    return MetricsResponse(**metrics)
+    return MetricsResponse(
+        **metrics,
+        usage=usage_recorder.stats,
+        cache={**result_cache.stats, "warm_targets": cache_warmer.target_count},
+    )
 
 
 @router.post(
@@ -75,7 +102,10 @@ async def get_metrics() -> MetricsResponse:
     summary="Navigate and Extract",
     description="Navigate to a URL and extract content (HTML, screenshot, or PDF).",
 )
-async def browse(request: BrowseRequest) -> BrowseResponse:
+async def browse(
+    request: BrowseRequest,
+    x_api_key: Optional[str] = Header(default=None),
+) -> BrowseResponse:
     """
     Main browser navigation endpoint.
     
@@ -84,22 +114,69 @@ async def browse(request: BrowseRequest) -> BrowseResponse:
     - **wait_for**: Optional CSS selector or time in ms to wait
     - **execute_js**: Optional JavaScript to execute before capture
     - **proxy_config**: Optional proxy configuration
+    - **X-API-Key** header: Tenant key used for fair scheduling
     """
-    log = logger.bind(url=request.url, action=request.action.value)
+    tenant = tenant_registry.resolve(x_api_key)
+    log = logger.bind(url=request.url, action=request.action.value, tenant=tenant.key_prefix)
     log.info("Processing browse request")
     
+    start_time = time.time()
+    result: Optional[BrowseResponse] = None
+    status_code = 499  # Client closed request unless we get further
+    try:
+        result = await _execute_browse(request, tenant, log)
+        status_code = status.HTTP_200_OK
+        return result
+    except HTTPException as e:
+        status_code = e.status_code
+        raise
+    finally:
+        usage_recorder.record(
+            tenant,
+            action=request.action.value,
+            url=request.url,
+            status_code=status_code,
+            response_bytes=_response_bytes(result),
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
+
+
+def _response_bytes(result: Optional[BrowseResponse]) -> int:
+    """Size of the extracted payload returned to the client."""
+    if result is None:
+        return 0
+    return sum(len(part) for part in (result.content, result.screenshot, result.pdf) if part)
+
+
+async def _execute_browse(request: BrowseRequest, tenant: Tenant, log) -> BrowseResponse:
+    """Run a browse request (or serve it from cache), mapping service errors to HTTP errors."""
+    if request.cache_ttl:
+        cache_warmer.observe(request)
+        cached = result_cache.get(request)
+        if cached:
+            log.info("Served from cache", cache_age_s=cached.cache_age_s)
+            return cached
+    
     try:
-        result = await browser_manager.browse(request)
+        result = await browser_manager.browse(request, tenant)
         log.info(
             "Browse request completed",
             execution_time_ms=result.execution_time_ms,
         )
-        return result
+    except Exception as e:
+        raise _browse_error(e, request, log)
     
-    except ValueError as e:
+    if request.cache_ttl:
+        result_cache.put(request, result, request.cache_ttl)
+    return result
+
+
+def _browse_error(e: Exception, request: Union[BrowseRequest, MonitorRequest], log) -> HTTPException:
+    """Map a service exception to the HTTP error returned to the client."""
+    if isinstance(e, ValueError):
         # SSRF or validation error
         log.warning(f"Request validation error: {e}")
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=ErrorResponse(
                 status="error",
@@ -108,10 +185,10 @@ async def browse(request: BrowseRequest) -> BrowseResponse:
             ).model_dump(),
         )
     
-    except TimeoutError as e:
+    if isinstance(e, TimeoutError):
         # Page load timeout
         log.error(f"Timeout error: {e}")
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail=ErrorResponse(
                 status="error",
@@ -121,10 +198,10 @@ async def browse(request: BrowseRequest) -> BrowseResponse:
             ).model_dump(),
         )
     
-    except ConnectionError as e:
+    if isinstance(e, ConnectionError):
         # Network/navigation error
         log.error(f"Connection error: {e}")
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=ErrorResponse(
                 status="error",
@@ -133,10 +210,10 @@ async def browse(request: BrowseRequest) -> BrowseResponse:
             ).model_dump(),
         )
     
-    except MemoryError as e:
+    if isinstance(e, MemoryError):
         # Service overloaded
         log.critical(f"Memory error: {e}")
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=ErrorResponse(
                 status="error",
@@ -145,16 +222,323 @@ async def browse(request: BrowseRequest) -> BrowseResponse:
             ).model_dump(),
         )
     
+    # Unexpected error
+    log.exception(f"Unexpected error: {e}")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=ErrorResponse(
+            status="error",
+            error_code="INTERNAL_ERROR",
+            message="An unexpected error occurred",
+            details={"error_type": type(e).__name__},
+        ).model_dump(),
+    )
+
+
+@router.post(
+    "/browse/stream",
+    summary="Navigate and Extract (Streaming)",
+    description=(
+        "Same as /browse, but returns a text/event-stream that reports each phase "
+        "as it completes. Closing the stream cancels the request and frees its browser slot."
+    ),
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def browse_stream(
+    request: BrowseRequest,
+    x_api_key: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    """
+    Streaming browser navigation endpoint (Server-Sent Events).
+    
+    Events, in order:
+    - **queued**: request accepted and waiting for a browser slot
+    - **navigated**: response received (`status_code`, `final_url`)
+    - **dom_ready**: DOMContentLoaded fired (`page_title`)
+    - **wait_satisfied**: `wait_for` condition met (only if requested)
+    - **artifact**: base64/HTML chunks (`field`, `index`, `data`, `last`)
+    - **complete**: final result metadata (same as /browse, without artifacts)
+    - **error**: error response (same body as /browse errors, plus `status_code`)
+    """
+    tenant = tenant_registry.resolve(x_api_key)
+    log = logger.bind(url=request.url, action=request.action.value, tenant=tenant.key_prefix)
+    log.info("Processing streaming browse request")
+    
+    return StreamingResponse(
+        _stream_browse(request, tenant, log),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Event."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def _stream_browse(request: BrowseRequest, tenant: Tenant, log) -> AsyncIterator[bytes]:
+    """Run browse in a task and relay its progress events as SSE."""
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def on_event(event: str, data: dict) -> None:
+        await events.put((event, data))
+    
+    async def run() -> None:
+        try:
+            await events.put(("result", await browser_manager.browse(request, tenant, on_event)))
+        except Exception as e:
+            await events.put(("exception", e))
+    
+    start_time = time.time()
+    result: Optional[BrowseResponse] = None
+    status_code = 499  # Client closed request unless we get further
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            event, data = await events.get()
+            
+            if event == "exception":
+                error = _browse_error(data, request, log)
+                status_code = error.status_code
+                yield _sse("error", {"status_code": error.status_code, **error.detail})
+                return
+            
+            if event == "result":
+                result = data
+                chunk_size = settings.stream_chunk_size
+                for field in ("content", "screenshot", "pdf"):
+                    value = getattr(result, field)
+                    if not value:
+                        continue
+                    chunks = range(0, len(value), chunk_size)
+                    for index, offset in enumerate(chunks):
+                        yield _sse("artifact", {
+                            "field": field,
+                            "index": index,
+                            "data": value[offset:offset + chunk_size],
+                            "last": index == len(chunks) - 1,
+                        })
+                status_code = status.HTTP_200_OK
+                yield _sse("complete", result.model_dump(exclude={"content", "screenshot", "pdf"}))
+                log.info("Streaming browse completed", execution_time_ms=result.execution_time_ms)
+                return
+            
+            yield _sse(event, data)
+    finally:
+        # Client went away (or we are done) - cancelling releases the browser slot
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        usage_recorder.record(
+            tenant,
+            action=request.action.value,
+            url=request.url,
+            status_code=status_code,
+            response_bytes=_response_bytes(result),
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
+
+
+@router.post(
+    "/crawl",
+    summary="Crawl",
+    description=(
+        "Crawl from seed URLs within scope rules, depth and page budget. "
+        "Results are streamed as Server-Sent Events as each page completes."
+    ),
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def crawl(
+    request: CrawlRequest,
+    x_api_key: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    """
+    Crawl endpoint (Server-Sent Events).
+    
+    - **page**: a rendered page (same fields as /browse, plus `depth`, `links_found`)
+    - **page_error**: a page that failed (`url`, `error_type`, `message`)
+    - **skipped**: a discovered URL rejected by SSRF protection
+    - **done**: crawl statistics
+    
+    Closing the stream stops the crawl and frees its browser slots.
+    """
+    tenant = tenant_registry.resolve(x_api_key)
+    log = logger.bind(seeds=request.seeds, tenant=tenant.key_prefix)
+    log.info("Processing crawl request", max_pages=request.max_pages, max_depth=request.max_depth)
+    
+    return StreamingResponse(
+        _stream_crawl(request, tenant),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_crawl(request: CrawlRequest, tenant: Tenant) -> AsyncIterator[bytes]:
+    """Relay crawl events as SSE, recording usage per crawled page."""
+    async for event, data in Crawler(request, tenant).run():
+        if event in ("page", "page_error"):
+            usage_recorder.record(
+                tenant,
+                action=request.action.value,
+                url=data["url"],
+                status_code=status.HTTP_200_OK if event == "page" else status.HTTP_502_BAD_GATEWAY,
+                response_bytes=sum(
+                    len(data.get(field) or "") for field in ("content", "screenshot", "pdf")
+                ),
+                execution_time_ms=data.get("execution_time_ms", 0.0),
+            )
+        yield _sse(event, data)
+
+
+@router.post(
+    "/monitor",
+    response_model=MonitorResponse,
+    responses={
+        200: {"description": "Change check completed"},
+        400: {"model": ErrorResponse, "description": "Invalid request parameters"},
+        502: {"model": ErrorResponse, "description": "Network/navigation error"},
+        504: {"model": ErrorResponse, "description": "Request timeout"},
+    },
+    summary="Monitor for Changes",
+    description=(
+        "Check a URL against the fingerprint stored at the previous check. "
+        "Returns 'unchanged', or a compact diff of the extracted text instead of the full content."
+    ),
+)
+async def monitor(
+    request: MonitorRequest,
+    x_api_key: Optional[str] = Header(default=None),
+) -> MonitorResponse:
+    """
+    Change-detection endpoint.
+    
+    A conditional request (ETag / Last-Modified) is tried first; the page is
+    only rendered when the origin cannot confirm it is unchanged.
+    """
+    tenant = tenant_registry.resolve(x_api_key)
+    log = logger.bind(url=request.url, tenant=tenant.key_prefix)
+    
+    start_time = time.time()
+    status_code = 499  # Client closed request unless we get further
+    try:
+        result = await change_monitor.check(request, tenant)
+        status_code = status.HTTP_200_OK
+        log.info("Monitor check completed", status=result.status, checked_via=result.checked_via)
+        return result
     except Exception as e:
-        # Unexpected error
-        log.exception(f"Unexpected error: {e}")
+        error = _browse_error(e, request, log)
+        status_code = error.status_code
+        raise error
+    finally:
+        usage_recorder.record(
+            tenant,
+            action="monitor",
+            url=request.url,
+            status_code=status_code,
+            response_bytes=0,
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
+
+
+@router.get(
+    "/cache/warm",
+    response_model=list[WarmEntryStatus],
+    summary="Cache Warming Status",
+    description="Warmed cache entries with their freshness and refresh history.",
+)
+async def list_warm_targets(
+    x_api_key: Optional[str] = Header(default=None),
+) -> list[WarmEntryStatus]:
+    """Freshness of the configured targets and those added with this API key."""
+    tenant = tenant_registry.resolve(x_api_key)
+    return cache_warmer.status(tenant.id)
+
+
+@router.post(
+    "/cache/warm",
+    response_model=WarmEntryStatus,
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid URL, template or refresh interval"},
+        403: {"model": ErrorResponse, "description": "No valid API key"},
+        429: {"model": ErrorResponse, "description": "Warming target limit reached"},
+    },
+    summary="Add Cache Warming Target",
+    description="Keep a URL rendered in the result cache, refreshed in the background.",
+)
+async def add_warm_target(
+    target: WarmTargetRequest,
+    x_api_key: Optional[str] = Header(default=None),
+) -> WarmEntryStatus:
+    """
+    Register a URL to keep warm, owned by the caller's API key.
+    
+    - **url**: URL to render
+    - **refresh_s**: Refresh interval; also the TTL of the cached result
+      (at least CACHE_WARM_MIN_API_REFRESH_S)
+    - **template**: Browse options for the render (action, wait_for, ...)
+    
+    Live requests hit the entry when they send the same options and a
+    `cache_ttl`. Refreshes render as, and are billed to, the API key. Each
+    key may add up to CACHE_WARM_MAX_TARGETS_PER_TENANT targets.
+    """
+    tenant = tenant_registry.resolve(x_api_key)
+    if tenant.id in (ANONYMOUS_TENANT_ID, UNKNOWN_KEY_TENANT_ID):
+        # Keyless and unknown keys share one tenant, so they could not own targets
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ErrorResponse(
+                status="error",
+                error_code="FORBIDDEN",
+                message="A valid API key is required to add cache warming targets",
+            ).model_dump(),
+        )
+    try:
+        key = cache_warmer.add(
+            target.url, target.refresh_s, target.template, source="api", tenant=tenant
+        )
+    except WarmTargetLimitError as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=ErrorResponse(
                 status="error",
-                error_code="INTERNAL_ERROR",
-                message="An unexpected error occurred",
-                details={"error_type": type(e).__name__},
+                error_code="LIMIT_EXCEEDED",
+                message=str(e),
+            ).model_dump(),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(
+                status="error",
+                error_code="VALIDATION_ERROR",
+                message=str(e),
+            ).model_dump(),
+        )
+    return cache_warmer.entry_status(key)
+
+
+@router.delete(
+    "/cache/warm/{key}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={404: {"model": ErrorResponse, "description": "Unknown warming target"}},
+    summary="Remove Cache Warming Target",
+)
+async def remove_warm_target(
+    key: str,
+    x_api_key: Optional[str] = Header(default=None),
+) -> None:
+    """Stop warming a target added with this API key (its cached result expires normally)."""
+    tenant = tenant_registry.resolve(x_api_key)
+    if not cache_warmer.remove(key, tenant.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorResponse(
+                status="error",
+                error_code="NOT_FOUND",
+                message=f"No warming target with key {key}",
             ).model_dump(),
         )
 
@@ -165,13 +549,16 @@ async def browse(request: BrowseRequest) -> BrowseResponse:
     summary="Quick Render",
     description="Quick render endpoint - equivalent to browse with action='render'.",
 )
-async def render_html(url: str) -> BrowseResponse:
+async def render_html(
+    url: str,
+    x_api_key: Optional[str] = Header(default=None),
+) -> BrowseResponse:
     """
     Quick render endpoint for HTML extraction.
     Convenience method for simple HTML rendering.
     """
     request = BrowseRequest(url=url, action="render")
-    return await browse(request)
+    return await browse(request, x_api_key)
 
 
 @router.post(
@@ -184,6 +571,7 @@ async def take_screenshot(
     url: str,
     full_page: bool = False,
     wait_for: str | int | None = None,
+    x_api_key: Optional[str] = Header(default=None),
 ) -> BrowseResponse:
     """
     Quick screenshot endpoint.
@@ -195,7 +583,7 @@ async def take_screenshot(
         full_page=full_page,
         wait_for=wait_for,
     )
-    return await browse(request)
+    return await browse(request, x_api_key)
 
 
 @router.post(
@@ -204,10 +592,13 @@ async def take_screenshot(
     summary="Quick PDF",
     description="Quick PDF endpoint - equivalent to browse with action='pdf'.",
 )
-async def generate_pdf(url: str) -> BrowseResponse:
+async def generate_pdf(
+    url: str,
+    x_api_key: Optional[str] = Header(default=None),
+) -> BrowseResponse:
     """
     Quick PDF generation endpoint.
     Convenience method for PDF generation.
     """
     request = BrowseRequest(url=url, action="pdf")
-    return await browse(request)
+    return await browse(request, x_api_key)
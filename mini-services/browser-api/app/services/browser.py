@@ -5,7 +5,7 @@ import asyncio
 import base64
 import ipaddress
 import time
-from typing import Optional, Union
+from typing import Awaitable, Callable, Optional, Union
 from urllib.parse import urlparse
 from contextlib import asynccontextmanager
 
@@ -20,10 +20,20 @@ from playwright.async_api import (
     TimeoutError as PlaywrightTimeoutError,
 )
 
+from ..config import settings
 from ..models.schemas import ActionType, BrowseRequest, BrowseResponse, ProxyConfig
+from .deadline import Deadline, DeadlineExceeded
+from .fair_queue import FairScheduler
+from .performance import PerformanceRecorder
+from .retry import LatencyTracker, ProxyPool, RetryPolicy, classify_error
+from .scheduler import DomainThrottled, domain_scheduler
+from .tenants import Tenant, tenant_registry
 
 logger = structlog.get_logger()
 
+# Progress callback: (event name, event data)
+EventCallback = Callable[[str, dict], Awaitable[None]]
+
 # Constants
 MAX_CONCURRENT_BROWSERS = 3  # Memory constraint: ~1-1.5GB per browser
 DEFAULT_USER_AGENT = (
@@ -32,6 +42,7 @@ DEFAULT_USER_AGENT = (
 )
 DEFAULT_VIEWPORT = {"width": 1920, "height": 1080}
 DEFAULT_TIMEOUT = 30000  # 30 seconds
+EXTRACTION_RESERVE_MS = 1000  # Budget kept for extraction after a selector wait
 
 # Anti-detection scripts
 STEALTH_SCRIPTS = [
@@ -79,6 +90,15 @@ class SSRFProtection:
         "169.254.169.254",  # Cloud metadata IP
     }
     
+    @classmethod
+    def allowed_hosts(cls) -> set[str]:
+        """Hostnames exempted via SSRF_ALLOWED_HOSTS."""
+        return {
+            host.strip().lower()
+            for host in settings.ssrf_allowed_hosts.split(",")
+            if host.strip()
+        }
+    
     @classmethod
     def is_blocked(cls, url: str) -> tuple[bool, str]:
         """Check if URL points to a blocked internal address."""
@@ -86,6 +106,10 @@ class SSRFProtection:
             parsed = urlparse(url)
             hostname = parsed.hostname or parsed.netloc.split(':')[0]
             
+            # Explicitly allowed hosts (configured by the operator)
+            if hostname.lower() in cls.allowed_hosts():
+                return False, ""
+            
             # Check blocked hostnames
             if hostname.lower() in cls.BLOCKED_HOSTNAMES:
                 return True, f"Hostname '{hostname}' is blocked"
@@ -113,13 +137,13 @@ class SSRFProtection:
 class BrowserManager:
     """
     Singleton browser manager with resource pooling.
-    Uses semaphore for concurrency control and maintains
-    a single browser instance with multiple contexts.
+    Uses a weighted fair queue across tenants for concurrency control
+    and maintains a single browser instance with multiple contexts.
     """
     
     _instance: Optional["BrowserManager"] = None
     _lock: asyncio.Lock = asyncio.Lock()
-    _semaphore: asyncio.Semaphore = asyncio.Semaphore(MAX_CONCURRENT_BROWSERS)
+    _slots: FairScheduler = FairScheduler(MAX_CONCURRENT_BROWSERS)
     
     def __new__(cls) -> "BrowserManager":
         if cls._instance is None:
@@ -135,12 +159,24 @@ class BrowserManager:
         self._browser: Optional[Browser] = None
         self._active_contexts: int = 0
         self._start_time: float = time.time()
+        self._warm_pool: list[BrowserContext] = []
+        self._warm_target: int = settings.warm_contexts
+        self._replenish_task: Optional[asyncio.Task] = None
+        self._ready: bool = False
+        self._cold_start_ms: Optional[float] = None
         self._metrics = {
             "total_requests": 0,
             "successful_requests": 0,
             "failed_requests": 0,
+            "partial_requests": 0,
             "total_response_time": 0.0,
+            "retries": {},
+            "hedged_requests": 0,
+            "hedge_wins": 0,
         }
+        self._retry_policy = RetryPolicy()
+        self._proxy_pool = ProxyPool()
+        self._latency = LatencyTracker()
     
     @property
     def active_contexts(self) -> int:
@@ -150,10 +186,23 @@ class BrowserManager:
     def available_slots(self) -> int:
         return MAX_CONCURRENT_BROWSERS - self._active_contexts
     
+    @property
+    def queued_requests(self) -> int:
+        return self._slots.queued
+    
     @property
     def uptime(self) -> float:
         return time.time() - self._start_time
     
+    @property
+    def ready(self) -> bool:
+        """True once warm-up finished and the browser is connected."""
+        return self._ready and self._browser is not None and self._browser.is_connected()
+    
+    @property
+    def cold_start_ms(self) -> Optional[float]:
+        return self._cold_start_ms
+    
     @property
     def metrics(self) -> dict:
         return {
@@ -163,7 +212,11 @@ class BrowserManager:
                 if self._metrics["total_requests"] > 0 else 0
             ),
             "active_contexts": self._active_contexts,
-            "queued_requests": MAX_CONCURRENT_BROWSERS - self._semaphore._value,
+            "queued_requests": self._slots.queued,
+            "tenants": self._slots.tenant_metrics,
+            "throttled_domains": domain_scheduler.throttled_domains,
+            "warm_contexts": len(self._warm_pool),
+            "cold_start_ms": self._cold_start_ms,
         }
     
     async def initialize(self) -> None:
@@ -174,6 +227,9 @@ class BrowserManager:
                 self._playwright = await async_playwright().start()
                 
             if self._browser is None or not self._browser.is_connected():
+                # Warm contexts belong to the old browser
+                relaunch = self._browser is not None
+                self._warm_pool.clear()
                 logger.info("Launching Chromium browser...")
                 self._browser = await self._playwright.chromium.launch(
                     headless=True,
@@ -189,10 +245,96 @@ class BrowserManager:
                     ],
                 )
                 logger.info("Browser launched successfully")
+                
+                if relaunch:
+                    # Refill the pool for the new browser (first launch is warm_up's job);
+                    # a refill still running was working against the dead one
+                    if self._replenish_task and not self._replenish_task.done():
+                        self._replenish_task.cancel()
+                    self._schedule_replenish()
+    
+    async def warm_up(self, max_backoff: float = 30.0) -> None:
+        """
+        Launch the browser and pre-create warm contexts concurrently.
+        Retries with backoff until it succeeds; marks the manager ready.
+        """
+        delay = 1.0
+        while True:
+            try:
+                await self.initialize()
+                await self._fill_warm_pool()
+                break
+            except Exception as e:
+                logger.error(f"Browser warm-up failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_backoff)
+        
+        self._ready = True
+        self._cold_start_ms = (time.time() - self._start_time) * 1000
+        logger.info(
+            "Browser warm-up complete",
+            warm_contexts=len(self._warm_pool),
+            cold_start_ms=round(self._cold_start_ms, 1),
+        )
+    
+    async def _new_default_context(self) -> BrowserContext:
+        """Create a context with default options and stealth scripts."""
+        context = await self._browser.new_context(
+            viewport=DEFAULT_VIEWPORT,
+            user_agent=DEFAULT_USER_AGENT,
+            ignore_https_errors=True,
+            java_script_enabled=True,
+            bypass_csp=True,
+        )
+        try:
+            for script in STEALTH_SCRIPTS:
+                await context.add_init_script(script)
+        except BaseException:
+            await context.close()
+            raise
+        return context
+    
+    async def _fill_warm_pool(self) -> None:
+        """Top the warm pool up to its target size."""
+        missing = self._warm_target - len(self._warm_pool)
+        if missing <= 0 or not self._browser or not self._browser.is_connected():
+            return
+        results = await asyncio.gather(
+            *(self._new_default_context() for _ in range(missing)),
+            return_exceptions=True,
+        )
+        # Keep the contexts that did open, so a retry only creates the rest
+        self._warm_pool.extend(r for r in results if not isinstance(r, BaseException))
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+    
+    def _schedule_replenish(self) -> None:
+        """Refill the warm pool in the background after one is used."""
+        if self._replenish_task is None or self._replenish_task.done():
+            self._replenish_task = asyncio.create_task(self._replenish())
+    
+    async def _replenish(self) -> None:
+        try:
+            await self._fill_warm_pool()
+        except Exception as e:
+            logger.warning(f"Failed to replenish warm contexts: {e}")
+    
+    def _take_warm_context(self, request: BrowseRequest) -> Optional[BrowserContext]:
+        """Pop a warm context if the request only needs default options."""
+        if request.proxy_config or request.user_agent or not self._warm_pool:
+            return None
+        return self._warm_pool.pop()
     
     async def shutdown(self) -> None:
         """Shutdown browser and cleanup resources."""
         async with self._lock:
+            self._ready = False
+            if self._replenish_task:
+                self._replenish_task.cancel()
+                self._replenish_task = None
+            self._warm_pool.clear()
+            
             if self._browser:
                 logger.info("Closing browser...")
                 await self._browser.close()
@@ -215,56 +357,98 @@ class BrowserManager:
         
         return proxy_settings
     
+    async def _new_page(self, request: BrowseRequest) -> tuple[BrowserContext, Page]:
+        """Take a warm context or create one for the request, and open a page."""
+        await self.initialize()
+        
+        viewport = {
+            "width": request.viewport_width,
+            "height": request.viewport_height,
+        }
+        
+        # Reuse a pre-warmed context when the options allow it
+        context = self._take_warm_context(request)
+        try:
+            if context:
+                self._schedule_replenish()
+                if request.headers:
+                    await context.set_extra_http_headers(request.headers)
+                page = await context.new_page()
+                if viewport != DEFAULT_VIEWPORT:
+                    await page.set_viewport_size(viewport)
+                return context, page
+            
+            # Build context options
+            context_options = {
+                "viewport": viewport,
+                "user_agent": request.user_agent or DEFAULT_USER_AGENT,
+                "ignore_https_errors": True,
+                "java_script_enabled": True,
+                "bypass_csp": True,
+            }
+            
+            # Add proxy if configured
+            proxy_settings = self._get_proxy_settings(request.proxy_config)
+            if proxy_settings:
+                context_options["proxy"] = proxy_settings
+            
+            # Add custom headers
+            if request.headers:
+                context_options["extra_http_headers"] = request.headers
+            
+            # Create isolated context
+            context = await self._browser.new_context(**context_options)
+            
+            # Inject anti-detection scripts
+            for script in STEALTH_SCRIPTS:
+                await context.add_init_script(script)
+            
+            # Create new page
+            return context, await context.new_page()
+        except BaseException:
+            if context:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"Error closing context: {e}")
+            raise
+    
+    @staticmethod
+    def _discard_opened(task: asyncio.Task) -> None:
+        """Close a context that finished opening after its request gave up."""
+        if not task.cancelled() and task.exception() is None:
+            context, _ = task.result()
+            asyncio.create_task(context.close())
+    
     @asynccontextmanager
     async def create_context(
         self,
         request: BrowseRequest,
+        tenant: Optional[Tenant] = None,
+        deadline: Optional[Deadline] = None,
     ):
         """
         Create an isolated browser context (incognito-like).
         Ensures proper cleanup even on errors.
+        Queueing and context creation count against `deadline`.
         """
+        deadline = deadline or Deadline(request.timeout)
         context: Optional[BrowserContext] = None
         page: Optional[Page] = None
         
-        async with self._semaphore:
+        async with self._slots.acquire(tenant or tenant_registry.anonymous, deadline):
             self._active_contexts += 1
-            start_time = time.time()
             
             try:
-                await self.initialize()
-                
-                # Build context options
-                context_options = {
-                    "viewport": {
-                        "width": request.viewport_width,
-                        "height": request.viewport_height,
-                    },
-                    "user_agent": request.user_agent or DEFAULT_USER_AGENT,
-                    "ignore_https_errors": True,
-                    "java_script_enabled": True,
-                    "bypass_csp": True,
-                }
-                
-                # Add proxy if configured
-                proxy_settings = self._get_proxy_settings(request.proxy_config)
-                if proxy_settings:
-                    context_options["proxy"] = proxy_settings
-                
-                # Add custom headers
-                if request.headers:
-                    context_options["extra_http_headers"] = request.headers
-                
-                # Create isolated context
-                context = await self._browser.new_context(**context_options)
-                
-                # Inject anti-detection scripts
-                for script in STEALTH_SCRIPTS:
-                    await context.add_init_script(script)
-                
-                # Create new page
-                page = await context.new_page()
-                page.set_default_timeout(request.timeout)
+                # Playwright calls cannot be cancelled browser-side, so a context
+                # still opening when the deadline hits is closed once it is ready
+                opening = asyncio.ensure_future(self._new_page(request))
+                try:
+                    context, page = await deadline.run(asyncio.shield(opening), "context creation")
+                except BaseException:
+                    opening.add_done_callback(self._discard_opened)
+                    raise
+                page.set_default_timeout(deadline.budget_ms("context creation"))
                 
                 yield page
                 
@@ -283,14 +467,170 @@ class BrowserManager:
                         logger.warning(f"Error closing context: {e}")
                 
                 self._active_contexts -= 1
-                self._metrics["total_requests"] += 1
-                self._metrics["total_response_time"] += (time.time() - start_time) * 1000
     
-    async def browse(self, request: BrowseRequest) -> BrowseResponse:
+    async def browse(
+        self,
+        request: BrowseRequest,
+        tenant: Optional[Tenant] = None,
+        on_event: Optional[EventCallback] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> BrowseResponse:
         """
         Execute browser navigation and content extraction.
+        If `on_event` is given, it is awaited as each phase completes
+        (queued, navigated, dom_ready, wait_satisfied, plus retrying and
+        hedged when those kick in).
+        
+        Transient failures (DNS, connection, renderer crash, timeout) are
+        retried with backoff while the shared deadline allows, rotating
+        through the retry proxy pool when one is configured. With
+        `request.hedge`, an attempt slower than the domain's p95 latency
+        is raced against a second one.
+        """
+        start_time = time.time()
+        deadline = deadline or Deadline(request.timeout)
+        # Counted once per call, however many attempts or hedges it took
+        try:
+            result = await self._browse_with_retries(request, tenant, on_event, deadline)
+        except (TimeoutError, ConnectionError):
+            self._metrics["failed_requests"] += 1
+            self._record_response_time(start_time)
+            raise
+        self._record_response_time(start_time)
+        
+        if result.status == "success":
+            self._metrics["successful_requests"] += 1
+            self._latency.record(request.url, result.execution_time_ms)
+        else:
+            self._metrics["partial_requests"] += 1
+        result.execution_time_ms = (time.time() - start_time) * 1000
+        return result
+    
+    def _record_response_time(self, start_time: float) -> None:
+        self._metrics["total_requests"] += 1
+        self._metrics["total_response_time"] += (time.time() - start_time) * 1000
+    
+    async def _browse_with_retries(
+        self,
+        request: BrowseRequest,
+        tenant: Optional[Tenant],
+        on_event: Optional[EventCallback],
+        deadline: Deadline,
+    ) -> BrowseResponse:
+        max_retries = (
+            self._retry_policy.max_retries if request.max_retries is None else request.max_retries
+        )
+        
+        attempt_request = request
+        retry = 0
+        while True:
+            # Keep enough of the deadline back for a retry after a hung navigation
+            reserve_ms = self._retry_policy.timeout_reserve_ms(retry, max_retries, deadline)
+            try:
+                if request.hedge:
+                    return await self._hedged(attempt_request, tenant, on_event, deadline, reserve_ms)
+                return await self._browse_once(attempt_request, tenant, on_event, deadline, reserve_ms)
+            except (TimeoutError, ConnectionError) as e:
+                error_class = classify_error(e)
+                delay = self._retry_policy.backoff(error_class, retry)
+                if (
+                    not self._retry_policy.should_retry(error_class, retry, max_retries)
+                    or (deadline.remaining - delay) * 1000 < self._retry_policy.min_budget_ms
+                ):
+                    raise
+                
+                self._metrics["retries"][error_class] = self._metrics["retries"].get(error_class, 0) + 1
+                attempt_request = self._retry_request(request, error_class)
+                retry += 1
+                logger.warning(
+                    f"Retrying {request.url} after {error_class} error "
+                    f"({retry}/{max_retries}) in {delay * 1000:.0f}ms: {e}"
+                )
+                if on_event:
+                    await on_event("retrying", {
+                        "attempt": retry + 1,
+                        "error_class": error_class,
+                        "message": str(e),
+                    })
+                await asyncio.sleep(delay)
+    
+    def _retry_request(self, request: BrowseRequest, error_class: str) -> BrowseRequest:
+        """Route a network-level retry through the next pool proxy, if configured."""
+        if error_class == "crash" or request.proxy_config or not self._proxy_pool:
+            return request  # Fresh context; a dead browser is relaunched on acquire
+        return request.model_copy(update={"proxy_config": self._proxy_pool.next()})
+    
+    def _can_hedge(self) -> bool:
+        """Hedge only on spare capacity so it never delays queued requests."""
+        return self._slots.queued == 0 and self.available_slots > 0
+    
+    async def _hedged(
+        self,
+        request: BrowseRequest,
+        tenant: Optional[Tenant],
+        on_event: Optional[EventCallback],
+        deadline: Deadline,
+        reserve_ms: float = 0,
+    ) -> BrowseResponse:
+        """
+        Run one attempt; if it is still going after the domain's p95
+        latency, start a second and return whichever succeeds first.
+        The loser is cancelled, which closes its context and frees its slot.
+        """
+        primary = asyncio.create_task(
+            self._browse_once(request, tenant, on_event, deadline, reserve_ms)
+        )
+        pending = {primary}
+        try:
+            p95 = self._latency.p95(request.url)
+            if p95 is not None:
+                done, _ = await asyncio.wait(pending, timeout=min(p95 / 1000, deadline.remaining))
+                if not done and self._can_hedge():
+                    self._metrics["hedged_requests"] += 1
+                    logger.info(f"Hedging {request.url} after p95 of {p95:.0f}ms")
+                    if on_event:
+                        await on_event("hedged", {"p95_ms": round(p95, 1)})
+                    pending.add(asyncio.create_task(
+                        self._browse_once(request, tenant, None, deadline, reserve_ms)
+                    ))
+            
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    if winner is not primary:
+                        self._metrics["hedge_wins"] += 1
+                    return winner.result()
+                if not pending:
+                    return done.pop().result()  # Every attempt failed - raise the last error
+        finally:
+            for task in pending:
+                task.cancel()
+                # Loser cleanup finishes in the background; keep its error from being logged as unretrieved
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    
+    async def _browse_once(
+        self,
+        request: BrowseRequest,
+        tenant: Optional[Tenant] = None,
+        on_event: Optional[EventCallback] = None,
+        deadline: Optional[Deadline] = None,
+        reserve_ms: float = 0,
+    ) -> BrowseResponse:
+        """
+        A single navigation and extraction attempt.
+        
+        All phases share one `deadline` (request.timeout from now unless
+        given); navigation leaves `reserve_ms` of it for a retry. If it runs out after navigation and `request.best_effort`
+        is set, whatever was captured so far is returned with status
+        "partial" instead of raising TimeoutError.
         """
         start_time = time.time()
+        deadline = deadline or Deadline(request.timeout)
+        
+        async def emit(event: str, **data) -> None:
+            if on_event:
+                await on_event(event, data)
         
         # SSRF Protection
         is_blocked, reason = SSRFProtection.is_blocked(request.url)
@@ -298,46 +638,82 @@ class BrowserManager:
             logger.warning(f"SSRF attempt blocked: {reason}")
             raise ValueError(f"URL blocked: {reason}")
         
-        async with self.create_context(request) as page:
+        await emit("queued", queued_requests=self._slots.queued)
+        
+        # Per-domain politeness gate sits in front of the browser slot
+        async with domain_scheduler.acquire(request.url, deadline), \
+                self.create_context(request, tenant, deadline) as page:
+            response = None
+            recorder = None
+            phase = "navigation"
             try:
+                if request.capture_performance:
+                    recorder = PerformanceRecorder(page)
+                    await recorder.start()
+                
+                # Politeness spacing is claimed here, once the slot is held
+                await domain_scheduler.pace(request.url, deadline)
+                
                 # Navigate to URL
                 logger.info(f"Navigating to: {request.url}")
                 
+                # Return on commit so the status is known before the DOM is parsed
                 response = await page.goto(
                     request.url,
-                    wait_until="domcontentloaded",
-                    timeout=request.timeout,
+                    wait_until="commit",
+                    timeout=deadline.budget_ms(phase, reserve_ms),
                 )
                 
                 if not response:
                     raise PlaywrightError("No response received from navigation")
                 
+                # Target is rate limiting us - back off this domain
+                if response.status in (429, 503):
+                    domain_scheduler.backoff(
+                        request.url, response.headers.get("retry-after")
+                    )
+                
+                await emit("navigated", status_code=response.status, final_url=page.url)
+                
+                phase = "dom_ready"
+                # With best_effort a slow DOM is returned as a partial result instead
+                await page.wait_for_load_state(
+                    "domcontentloaded",
+                    timeout=deadline.budget_ms(phase, 0 if request.best_effort else reserve_ms),
+                )
+                await emit("dom_ready", page_title=await deadline.run(page.title(), phase))
+                
                 # Wait for specific element or time
                 if request.wait_for:
-                    await self._wait_for(page, request.wait_for, request.timeout)
+                    phase = "wait_for"
+                    await self._wait_for(page, request.wait_for, deadline)
+                    await emit("wait_satisfied", wait_for=request.wait_for)
                 
                 # Execute custom JavaScript
                 if request.execute_js:
+                    phase = "execute_js"
                     logger.debug(f"Executing custom JS: {request.execute_js[:50]}...")
-                    await page.evaluate(request.execute_js)
+                    await deadline.run(page.evaluate(request.execute_js), phase)
                 
                 # Extract content based on action
+                phase = "extraction"
                 content = None
                 screenshot = None
                 pdf = None
                 
                 if request.action == ActionType.RENDER:
-                    content = await page.content()
+                    content = await deadline.run(page.content(), phase)
                 
                 elif request.action == ActionType.SCREENSHOT:
                     screenshot_bytes = await page.screenshot(
                         full_page=request.full_page,
                         type="png",
+                        timeout=deadline.budget_ms(phase),
                     )
                     screenshot = base64.b64encode(screenshot_bytes).decode("utf-8")
                 
                 elif request.action == ActionType.PDF:
-                    pdf_bytes = await page.pdf(
+                    pdf_bytes = await deadline.run(page.pdf(
                         format="A4",
                         print_background=True,
                         margin={
@@ -346,14 +722,22 @@ class BrowserManager:
                             "bottom": "1cm",
                             "left": "1cm",
                         },
-                    )
+                    ), phase)
                     pdf = base64.b64encode(pdf_bytes).decode("utf-8")
                 
+                # Collect absolute link targets (deduplicated in-page)
+                links = None
+                if request.extract_links:
+                    links = await deadline.run(page.eval_on_selector_all(
+                        "a[href]",
+                        "els => [...new Set(els.map(e => e.href).filter(h => h.startsWith('http')))]",
+                    ), phase)
+                
                 # Get page metadata
                 final_url = page.url
-                page_title = await page.title()
+                page_title = await deadline.run(page.title(), phase)
                 
-                self._metrics["successful_requests"] += 1
+                performance = await deadline.run(recorder.collect(), phase) if recorder else None
                 
                 return BrowseResponse(
                     status="success",
@@ -363,34 +747,78 @@ class BrowserManager:
                     screenshot=screenshot,
                     pdf=pdf,
                     content_type=response.headers.get("content-type"),
+                    status_code=response.status,
                     page_title=page_title,
+                    links=links,
+                    performance=performance,
                     execution_time_ms=(time.time() - start_time) * 1000,
                 )
                 
-            except PlaywrightTimeoutError as e:
-                self._metrics["failed_requests"] += 1
-                logger.error(f"Timeout error for {request.url}: {e}")
-                raise TimeoutError(f"Page load timeout: {str(e)}")
+            except (PlaywrightTimeoutError, DeadlineExceeded) as e:
+                if isinstance(e, DomainThrottled):
+                    raise
+                if request.best_effort and response is not None:
+                    logger.warning(f"Deadline hit during {phase} for {request.url}, returning partial result")
+                    return await self._partial_result(page, request, response, phase, recorder, start_time)
+                logger.error(f"Timeout error for {request.url} during {phase}: {e}")
+                raise TimeoutError(f"Page load timeout during {phase}: {str(e)}")
             
             except PlaywrightError as e:
-                self._metrics["failed_requests"] += 1
                 logger.error(f"Playwright error for {request.url}: {e}")
                 raise ConnectionError(f"Navigation failed: {str(e)}")
     
+    async def _partial_result(
+        self,
+        page: Page,
+        request: BrowseRequest,
+        response,
+        phase: str,
+        recorder: Optional[PerformanceRecorder],
+        start_time: float,
+    ) -> BrowseResponse:
+        """Best-effort snapshot after the deadline, bounded by a short grace window."""
+        grace = Deadline(settings.best_effort_grace_ms)
+        content = page_title = performance = None
+        try:
+            page_title = await grace.run(page.title(), "partial capture")
+            content = await grace.run(page.content(), "partial capture")
+            if recorder:
+                performance = await grace.run(recorder.collect(), "partial capture")
+        except (PlaywrightError, DeadlineExceeded) as e:
+            logger.warning(f"Partial capture incomplete for {request.url}: {e}")
+        
+        final_url = page.url
+        return BrowseResponse(
+            status="partial",
+            url=request.url,
+            final_url=final_url if final_url != request.url else None,
+            content=content,
+            content_type=response.headers.get("content-type"),
+            status_code=response.status,
+            page_title=page_title,
+            performance=performance,
+            timed_out_during=phase,
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
+    
     async def _wait_for(
         self,
         page: Page,
         wait_for: Union[str, int],
-        timeout: int,
+        deadline: Deadline,
     ) -> None:
         """Handle wait_for parameter (selector or time)."""
         if isinstance(wait_for, int):
             # Wait for specific time in milliseconds
-            await page.wait_for_timeout(wait_for)
+            await deadline.run(page.wait_for_timeout(wait_for), "wait_for")
         else:
-            # Wait for CSS selector
+            # Wait for CSS selector; a missing selector is not fatal, so
+            # keep some budget back to still extract the page afterwards
             try:
-                await page.wait_for_selector(wait_for, timeout=timeout)
+                await page.wait_for_selector(
+                    wait_for,
+                    timeout=deadline.budget_ms("wait_for", reserve_ms=EXTRACTION_RESERVE_MS),
+                )
             except PlaywrightTimeoutError:
                 logger.warning(f"Selector '{wait_for}' not found within timeout")
 
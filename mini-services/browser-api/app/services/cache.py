@@ -0,0 +1,399 @@
+"""
+Result Cache - Cached browse results with scheduled background warming.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+import structlog
+
+from ..config import settings
+from ..models.schemas import BrowseRequest, BrowseResponse, WarmEntryStatus
+from .browser import browser_manager
+from .tenants import Plan, Tenant
+from .usage import usage_recorder
+
+logger = structlog.get_logger()
+
+# Request fields that change the rendered result (timeouts, retries etc. do not)
+CACHE_KEY_FIELDS = {
+    "url", "action", "wait_for", "execute_js", "proxy_config", "viewport_width",
+    "viewport_height", "full_page", "user_agent", "headers", "extract_links",
+    "capture_performance",
+}
+
+# Wait before retrying a target whose refresh failed
+FAILED_REFRESH_BACKOFF_S = 60
+
+# Background refreshes of configured and learned targets are scheduled as
+# their own low-weight tenant; API targets render (and bill) as their owner
+WARMER_TENANT = Tenant(
+    id="cache-warmer",
+    key_prefix="cache-warmer",
+    plan=Plan(id="cache-warmer", features={"weight": 0.5, "max_concurrency": 1}),
+)
+
+
+class WarmTargetLimitError(ValueError):
+    """Adding a warm target would exceed CACHE_WARM_MAX_TARGETS or the per-tenant cap."""
+
+
+def cache_key(request: BrowseRequest) -> str:
+    """Stable key over the request fields that affect the result."""
+    payload = request.model_dump(mode="json", include=CACHE_KEY_FIELDS)
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()[:32]
+
+
+class _Entry:
+    __slots__ = ("result", "size", "stored_at", "expires_at")
+
+    def __init__(self, result: BrowseResponse, ttl_s: float):
+        self.result = result
+        self.size = sum(len(part) for part in (result.content, result.screenshot, result.pdf) if part)
+        self.stored_at = time.monotonic()
+        self.expires_at = self.stored_at + ttl_s
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+    @property
+    def expires_in(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+class ResultCache:
+    """In-memory LRU of successful browse results, bounded by payload size."""
+
+    def __init__(self, max_bytes: int = settings.cache_max_mb * 1024 * 1024):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {**self._stats, "entries": len(self._entries), "bytes": self._bytes}
+
+    def entry(self, key: str) -> Optional[_Entry]:
+        """Current entry for a key, without touching LRU order or counters."""
+        return self._entries.get(key)
+
+    def get(self, request: BrowseRequest) -> Optional[BrowseResponse]:
+        """A cached result no older than request.cache_ttl, if any."""
+        key = cache_key(request)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_in <= 0 or entry.age > request.cache_ttl:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry.result.model_copy(update={
+            "cached": True,
+            "cache_age_s": round(entry.age, 3),
+            "execution_time_ms": 0.0,
+        })
+
+    def put(self, request: BrowseRequest, result: BrowseResponse, ttl_s: float) -> bool:
+        """Cache a result; False if it is not cacheable."""
+        if result.status != "success" or not result.status_code or not 200 <= result.status_code < 300:
+            return False  # Never cache partial results or error pages (429s, 5xx, ...)
+        key = cache_key(request)
+        entry = _Entry(result, ttl_s)
+        if entry.size > self._max_bytes:
+            return False
+        previous = self._entries.pop(key, None)
+        if previous:
+            self._bytes -= previous.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._stats["evictions"] += 1
+        return True
+
+
+class _WarmTarget:
+    __slots__ = (
+        "request", "refresh_s", "source", "tenant", "last_access", "refreshes",
+        "failures", "last_error", "last_render_ms", "retry_at",
+    )
+
+    def __init__(
+        self,
+        request: BrowseRequest,
+        refresh_s: int,
+        source: str,
+        tenant: Optional[Tenant] = None,
+    ):
+        self.request = request
+        self.refresh_s = refresh_s
+        self.source = source
+        self.tenant = tenant  # Owner of an API target
+        self.last_access = time.monotonic()
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_render_ms: Optional[float] = None
+        self.retry_at = 0.0
+
+    @property
+    def tenant_id(self) -> Optional[str]:
+        return self.tenant.id if self.tenant else None
+
+
+class CacheWarmer:
+    """
+    Keeps hot results in the cache by re-rendering them shortly before
+    they expire. Targets come from a config file, the API (owned by the
+    caller's tenant), or are learned from cache lookups (a key requested
+    often enough within a window). Each source is capped.
+    Refreshes only start while no request is queued and enough browser
+    slots are free, run one at a time, and are scheduled as a low-weight
+    tenant, so live traffic always goes first.
+    """
+
+    def __init__(
+        self,
+        cache: ResultCache,
+        targets_path: str = settings.cache_warm_targets_path,
+        tick_s: float = settings.cache_warm_tick_s,
+        refresh_ahead_s: float = settings.cache_refresh_ahead_s,
+        min_free_slots: int = settings.cache_warm_min_free_slots,
+    ):
+        self._cache = cache
+        self._targets_path = targets_path
+        self._tick = tick_s
+        self._refresh_ahead = refresh_ahead_s
+        self._min_free_slots = min_free_slots
+        self._targets: dict[str, _WarmTarget] = {}
+        self._accesses: OrderedDict[str, deque[float]] = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    @property
+    def target_count(self) -> int:
+        return len(self._targets)
+
+    def load(self) -> None:
+        """Load configured targets from CACHE_WARM_TARGETS_PATH."""
+        if not self._targets_path:
+            return
+        targets = json.loads(Path(self._targets_path).read_text())
+        for target in targets:
+            self.add(target["url"], target["refresh_s"], target.get("template") or {})
+        logger.info(f"Loaded {len(targets)} cache warming targets from {self._targets_path}")
+
+    def add(
+        self,
+        url: str,
+        refresh_s: int,
+        template: Optional[dict[str, Any]] = None,
+        source: str = "configured",
+        tenant: Optional[Tenant] = None,
+    ) -> str:
+        """
+        Register a warm target. Raises ValueError for an invalid template
+        or an API target refreshed more often than CACHE_WARM_MIN_API_REFRESH_S,
+        and WarmTargetLimitError when a cap is reached. A target someone
+        else already keeps warm is left as it is.
+        """
+        if source == "api" and refresh_s < settings.cache_warm_min_api_refresh_s:
+            raise ValueError(
+                f"refresh_s must be at least {settings.cache_warm_min_api_refresh_s}s"
+            )
+        tenant_id = tenant.id if tenant else None
+        request = BrowseRequest(**{**(template or {}), "url": url, "cache_ttl": refresh_s})
+        key = cache_key(request)
+        existing = self._targets.get(key)
+        if existing and existing.source != "learned":
+            if existing.tenant_id == tenant_id:
+                existing.refresh_s = refresh_s
+                existing.request = request
+            return key
+
+        managed = [t for t in self._targets.values() if t.source != "learned"]
+        if len(managed) >= settings.cache_warm_max_targets:
+            raise WarmTargetLimitError(
+                f"At most {settings.cache_warm_max_targets} cache warming targets are allowed"
+            )
+        if tenant_id is not None and sum(
+            1 for t in managed if t.tenant_id == tenant_id
+        ) >= settings.cache_warm_max_targets_per_tenant:
+            raise WarmTargetLimitError(
+                f"At most {settings.cache_warm_max_targets_per_tenant} "
+                f"cache warming targets are allowed per API key"
+            )
+        self._targets[key] = _WarmTarget(request, refresh_s, source, tenant)
+        return key
+
+    def remove(self, key: str, tenant_id: Optional[str] = None) -> bool:
+        """Remove a target owned by `tenant_id`; False if there is none."""
+        target = self._targets.get(key)
+        if target is None or target.source == "learned" or target.tenant_id != tenant_id:
+            return False
+        del self._targets[key]
+        return True
+
+    def observe(self, request: BrowseRequest) -> None:
+        """Record a cache lookup; frequently requested keys become learned targets."""
+        key = cache_key(request)
+        now = time.monotonic()
+        target = self._targets.get(key)
+        if target:
+            target.last_access = now
+            return
+
+        accesses = self._accesses.get(key)
+        if accesses is None:
+            if len(self._accesses) >= settings.cache_learn_max_targets * 100:
+                self._accesses.popitem(last=False)
+            accesses = self._accesses[key] = deque(maxlen=settings.cache_learn_min_hits)
+        accesses.append(now)
+
+        learned = sum(1 for t in self._targets.values() if t.source == "learned")
+        if (
+            len(accesses) == settings.cache_learn_min_hits
+            and now - accesses[0] <= settings.cache_learn_window_s
+            and learned < settings.cache_learn_max_targets
+        ):
+            del self._accesses[key]
+            refresh_s = max(10, request.cache_ttl)
+            self._targets[key] = _WarmTarget(
+                request.model_copy(update={"cache_ttl": refresh_s}), refresh_s, "learned"
+            )
+            logger.info(f"Learned cache warming target {request.url} (every {refresh_s}s)")
+
+    def _idle(self) -> bool:
+        return (
+            browser_manager.ready
+            and browser_manager.queued_requests == 0
+            and browser_manager.available_slots >= self._min_free_slots
+        )
+
+    def _next_due(self) -> Optional[tuple[str, _WarmTarget]]:
+        """The target closest to (or furthest past) expiry that needs a refresh."""
+        due = []
+        now = time.monotonic()
+        for key, target in self._targets.items():
+            if target.retry_at > now:
+                continue
+            entry = self._cache.entry(key)
+            expires_in = entry.expires_in if entry else float("-inf")
+            if expires_in <= min(self._refresh_ahead, target.refresh_s / 2):
+                due.append((expires_in, key, target))
+        if not due:
+            return None
+        _, key, target = min(due, key=lambda d: d[0])
+        return key, target
+
+    def _prune_learned(self) -> None:
+        now = time.monotonic()
+        for key, target in list(self._targets.items()):
+            if target.source == "learned" and now - target.last_access > settings.cache_learn_idle_s:
+                del self._targets[key]
+                logger.info(f"Dropped idle learned warming target {target.request.url}")
+
+    async def _refresh(self, key: str, target: _WarmTarget) -> None:
+        start_time = time.time()
+        try:
+            result = await browser_manager.browse(target.request, target.tenant or WARMER_TENANT)
+        except Exception as e:
+            self._record_usage(
+                target, 504 if isinstance(e, TimeoutError) else 502, (time.time() - start_time) * 1000
+            )
+            target.failures += 1
+            target.last_error = f"{type(e).__name__}: {e}"
+            target.retry_at = time.monotonic() + min(target.refresh_s, FAILED_REFRESH_BACKOFF_S)
+            logger.warning(f"Cache warming failed for {target.request.url}: {e}")
+            return
+        target.last_render_ms = (time.time() - start_time) * 1000
+        self._record_usage(target, 200, target.last_render_ms)
+        if key not in self._targets:
+            return  # Removed while rendering
+        if not self._cache.put(target.request, result, target.refresh_s):
+            # Error page or partial render - not cached, so back off like a failure
+            target.failures += 1
+            target.last_error = f"Not cacheable: status {result.status}, HTTP {result.status_code}"
+            target.retry_at = time.monotonic() + min(target.refresh_s, FAILED_REFRESH_BACKOFF_S)
+            logger.warning(f"Cache warming of {target.request.url} returned HTTP {result.status_code}")
+            return
+        target.refreshes += 1
+        target.last_error = None
+
+    @staticmethod
+    def _record_usage(target: _WarmTarget, status_code: int, execution_time_ms: float) -> None:
+        """Bill a refresh of an API target to its owner (nothing is returned, so no bytes)."""
+        if target.tenant is None:
+            return
+        usage_recorder.record(
+            target.tenant,
+            action=target.request.action.value,
+            url=target.request.url,
+            status_code=status_code,
+            response_bytes=0,
+            execution_time_ms=execution_time_ms,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._tick)
+            self._prune_learned()
+            if self._refreshing and not self._refreshing.done():
+                continue
+            if not self._idle():
+                continue
+            due = self._next_due()
+            if due:
+                self._refreshing = asyncio.create_task(self._refresh(*due))
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._refreshing):
+            if task:
+                task.cancel()
+        self._task = self._refreshing = None
+
+    def status(self, tenant_id: Optional[str] = None) -> list[WarmEntryStatus]:
+        """
+        Freshness of the configured targets and those `tenant_id` added
+        through the API. Learned targets stay private, they reveal what
+        other tenants request.
+        """
+        return [
+            self.entry_status(key)
+            for key, target in self._targets.items()
+            if target.source == "configured" or (target.source == "api" and target.tenant_id == tenant_id)
+        ]
+
+    def entry_status(self, key: str) -> WarmEntryStatus:
+        """Freshness of one warm target."""
+        target = self._targets[key]
+        entry = self._cache.entry(key)
+        return WarmEntryStatus(
+            key=key,
+            url=target.request.url,
+            action=target.request.action.value,
+            source=target.source,
+            refresh_s=target.refresh_s,
+            fresh=bool(entry and entry.expires_in > 0),
+            age_s=round(entry.age, 3) if entry else None,
+            expires_in_s=round(entry.expires_in, 3) if entry else None,
+            refreshes=target.refreshes,
+            failures=target.failures,
+            last_error=target.last_error,
+            last_render_ms=target.last_render_ms,
+        )
+
+
+# Global result cache and warmer instances
+result_cache = ResultCache()
+cache_warmer = CacheWarmer(result_cache)
@@ -0,0 +1,285 @@
+"""
+Cluster Service - Consistent hashing and node registration for cluster mode.
+"""
+import asyncio
+import bisect
+import hashlib
+import time
+from typing import Optional
+
+import httpx
+import structlog
+
+from ..config import settings
+from ..models.schemas import ClusterNodeStatus
+
+logger = structlog.get_logger()
+
+# Header carrying CLUSTER_SECRET on node registration and deregistration
+CLUSTER_SECRET_HEADER = "X-Cluster-Secret"
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes."""
+
+    def __init__(self, virtual_nodes: int = settings.cluster_virtual_nodes):
+        self._virtual_nodes = virtual_nodes
+        self._keys: list[int] = []
+        self._owners: dict[int, str] = {}
+
+    @property
+    def nodes(self) -> set[str]:
+        return set(self._owners.values())
+
+    def add(self, node: str) -> None:
+        for i in range(self._virtual_nodes):
+            key = _hash(f"{node}#{i}")
+            if key not in self._owners:
+                bisect.insort(self._keys, key)
+                self._owners[key] = node
+
+    def remove(self, node: str) -> None:
+        for i in range(self._virtual_nodes):
+            key = _hash(f"{node}#{i}")
+            if self._owners.get(key) == node:
+                del self._owners[key]
+                self._keys.remove(key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Node owning `key`, or None if the ring is empty."""
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[self._keys[index]]
+
+
+class NodeState:
+    """Coordinator-side state of one registered node."""
+
+    # Consecutive failed health polls before a node leaves the ring
+    MAX_FAILURES = 3
+
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = False
+        self.active_contexts = 0
+        self.available_slots = 0
+        self.in_flight = 0
+        self.routed = 0
+        self.spilled = 0
+        self.failures = 0
+        self.last_heartbeat = time.monotonic()
+
+    @property
+    def capacity(self) -> int:
+        return self.active_contexts + self.available_slots
+
+    @property
+    def free_slots(self) -> int:
+        """
+        Estimated free slots. The polled figure lags behind, so requests
+        the coordinator has in flight count as busy until the next poll
+        catches up with them.
+        """
+        return self.capacity - max(self.active_contexts, self.in_flight)
+
+    def status(self) -> ClusterNodeStatus:
+        return ClusterNodeStatus(
+            url=self.url,
+            healthy=self.healthy,
+            active_contexts=self.active_contexts,
+            available_slots=self.available_slots,
+            in_flight=self.in_flight,
+            routed=self.routed,
+            spilled=self.spilled,
+            last_heartbeat_s=time.monotonic() - self.last_heartbeat,
+        )
+
+
+class Cluster:
+    """
+    Routing table of the coordinator. Healthy nodes sit on a consistent
+    hash ring keyed by target domain so a domain keeps hitting the same
+    node (warm contexts, per-domain politeness, caches). When the owner
+    has no free slot the request spills over to the node with the most
+    free slots; if every node is saturated it queues on the owner.
+    Slot data comes from polling each node's /api/v1/health.
+    """
+
+    def __init__(
+        self,
+        poll_interval_s: float = settings.cluster_poll_interval_s,
+        node_ttl_s: float = settings.cluster_node_ttl_s,
+    ):
+        self._poll_interval = poll_interval_s
+        self._node_ttl = node_ttl_s
+        self._nodes: dict[str, NodeState] = {}
+        self._ring = HashRing()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def nodes(self) -> list[NodeState]:
+        return list(self._nodes.values())
+
+    def register(self, url: str) -> NodeState:
+        """Register a node or refresh its heartbeat."""
+        node = self._nodes.get(url)
+        if node is None:
+            node = self._nodes[url] = NodeState(url)
+            logger.info(f"Cluster node registered: {url}")
+            if self._client:
+                asyncio.create_task(self._poll(node))
+        node.last_heartbeat = time.monotonic()
+        return node
+
+    def deregister(self, url: str) -> None:
+        if self._nodes.pop(url, None):
+            self._ring.remove(url)
+            logger.info(f"Cluster node deregistered: {url}")
+
+    def _set_healthy(self, node: NodeState, healthy: bool) -> None:
+        if healthy == node.healthy:
+            return
+        node.healthy = healthy
+        if healthy:
+            self._ring.add(node.url)
+        else:
+            self._ring.remove(node.url)
+        logger.info(f"Cluster node {node.url} is now {'healthy' if healthy else 'unhealthy'}")
+
+    def mark_failed(self, node: NodeState) -> None:
+        """Take a node out of the ring after a failed proxy attempt."""
+        node.failures = NodeState.MAX_FAILURES
+        self._set_healthy(node, False)
+
+    def pick(self, routing_key: Optional[str], exclude: frozenset[str] = frozenset()) -> Optional[NodeState]:
+        """Choose the node for a request keyed by target domain."""
+        candidates = [n for n in self._nodes.values() if n.healthy and n.url not in exclude]
+        if not candidates:
+            return None
+        least_loaded = max(candidates, key=lambda n: (n.free_slots, -n.in_flight))
+
+        owner = self._nodes.get(self._ring.get(routing_key)) if routing_key else None
+        if owner is None or owner.url in exclude:
+            return least_loaded
+        if owner.free_slots <= 0 and least_loaded.free_slots > 0:
+            least_loaded.spilled += 1
+            return least_loaded
+        owner.routed += 1
+        return owner
+
+    async def _poll(self, node: NodeState) -> None:
+        try:
+            response = await self._client.get(f"{node.url}/api/v1/health")
+            response.raise_for_status()
+            health = response.json()
+            if not isinstance(health, dict):
+                raise ValueError(f"unexpected health payload {type(health).__name__}")
+            active_contexts = int(health.get("active_contexts", 0))
+            available_slots = int(health.get("available_slots", 0))
+        except (httpx.HTTPError, ValueError, TypeError) as e:
+            node.failures += 1
+            if node.failures >= NodeState.MAX_FAILURES:
+                self._set_healthy(node, False)
+            logger.debug(f"Health poll of {node.url} failed: {e}")
+            return
+        node.failures = 0
+        node.active_contexts = active_contexts
+        node.available_slots = available_slots
+        # "degraded" means the node's browser is not warmed up yet
+        self._set_healthy(node, health.get("status") == "healthy")
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            for node in self.nodes:
+                if now - node.last_heartbeat > self._node_ttl:
+                    logger.warning(f"Cluster node {node.url} missed its heartbeats")
+                    self.deregister(node.url)
+            results = await asyncio.gather(
+                *(self._poll(node) for node in self.nodes), return_exceptions=True
+            )
+            for error in results:
+                if isinstance(error, Exception):
+                    logger.error(f"Cluster health poll failed: {error}")
+            await asyncio.sleep(self._poll_interval)
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=max(self._poll_interval, 1.0))
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+
+class ClusterMember:
+    """
+    Registers this node with the cluster coordinator and keeps the
+    registration alive with periodic heartbeats. Disabled unless both
+    CLUSTER_COORDINATOR_URL and CLUSTER_NODE_URL are set.
+    """
+
+    def __init__(
+        self,
+        coordinator_url: str = settings.cluster_coordinator_url,
+        node_url: str = settings.cluster_node_url,
+        heartbeat_s: float = settings.cluster_heartbeat_s,
+        secret: str = settings.cluster_secret,
+    ):
+        self._coordinator_url = coordinator_url.rstrip("/")
+        self._node_url = node_url.rstrip("/")
+        self._heartbeat = heartbeat_s
+        self._headers = {CLUSTER_SECRET_HEADER: secret} if secret else {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._coordinator_url and self._node_url)
+
+    async def start(self) -> None:
+        if self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        async with httpx.AsyncClient(timeout=self._heartbeat) as client:
+            while True:
+                try:
+                    response = await client.post(
+                        f"{self._coordinator_url}/cluster/nodes",
+                        json={"url": self._node_url},
+                        headers=self._headers,
+                    )
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    logger.warning(f"Cluster heartbeat to {self._coordinator_url} failed: {e}")
+                await asyncio.sleep(self._heartbeat)
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        self._task = None
+        try:
+            async with httpx.AsyncClient(timeout=self._heartbeat) as client:
+                await client.request(
+                    "DELETE",
+                    f"{self._coordinator_url}/cluster/nodes",
+                    json={"url": self._node_url},
+                    headers=self._headers,
+                )
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to deregister from cluster coordinator: {e}")
+
+
+# Global cluster member instance
+cluster_member = ClusterMember()
@@ -0,0 +1,211 @@
+"""
+Crawler Service - Crawl jobs over the browser pool with a deduplicating frontier.
+"""
+import asyncio
+import hashlib
+import math
+import re
+from typing import AsyncIterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import structlog
+
+from ..models.schemas import BrowseRequest, CrawlRequest
+from .browser import SSRFProtection, browser_manager
+from .scheduler import registered_domain
+from .tenants import Tenant
+
+logger = structlog.get_logger()
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid"}
+
+# Expected links discovered per crawled page, used to size the Bloom filter
+LINKS_PER_PAGE = 100
+BLOOM_ERROR_RATE = 0.001
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """
+    Normalize a URL for deduplication: lowercase scheme and host, drop
+    default ports, fragments and tracking parameters, sort the query.
+    Returns None for non-HTTP(S) URLs.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return None
+
+    netloc = parsed.hostname.lower().rstrip(".")
+    if parsed.port and parsed.port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{parsed.port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.startswith("utm_") and key not in TRACKING_PARAMS
+    )
+    return urlunparse((scheme, netloc, parsed.path or "/", "", urlencode(query), ""))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over BLAKE2b."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self._size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._size
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns False if it was (probably) already present."""
+        added = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(item))
+
+
+class CrawlScope:
+    """Decides whether a discovered URL belongs to the crawl."""
+
+    def __init__(self, request: CrawlRequest):
+        self._domains = {registered_domain(seed) for seed in request.seeds}
+        self._same_domain = request.same_domain
+        self._include = [re.compile(p) for p in request.include_patterns]
+        self._exclude = [re.compile(p) for p in request.exclude_patterns]
+
+    def allows(self, url: str) -> bool:
+        if self._same_domain and registered_domain(url) not in self._domains:
+            return False
+        if self._include and not any(p.search(url) for p in self._include):
+            return False
+        return not any(p.search(url) for p in self._exclude)
+
+
+class Crawler:
+    """
+    A single crawl job. Seeds and in-scope links are fed into a frontier
+    deduplicated by a Bloom filter over canonical URLs; a fixed number of
+    workers render pages through the shared browser pool (so per-domain
+    politeness and tenant fair queueing still apply) and results are
+    yielded as they complete.
+    """
+
+    def __init__(self, request: CrawlRequest, tenant: Optional[Tenant] = None):
+        self._request = request
+        self._tenant = tenant
+        self._scope = CrawlScope(request)
+        self._seen = BloomFilter(request.max_pages * LINKS_PER_PAGE)
+        self._frontier: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
+        self._events: asyncio.Queue[tuple[str, dict]] = asyncio.Queue()
+        self._stats = {"pages": 0, "failed": 0, "discovered": 0, "duplicates": 0, "blocked": 0}
+
+    def _page_request(self, url: str) -> BrowseRequest:
+        return BrowseRequest(
+            url=url,
+            action=self._request.action,
+            wait_for=self._request.wait_for,
+            timeout=self._request.timeout,
+            user_agent=self._request.user_agent,
+            headers=self._request.headers,
+            proxy_config=self._request.proxy_config,
+            extract_links=True,
+        )
+
+    async def _enqueue(self, url: str, depth: int) -> None:
+        """Canonicalize, dedupe, scope- and SSRF-check a URL before queueing."""
+        if self._stats["discovered"] >= self._request.max_pages:
+            return  # Page budget already queued
+        canonical = canonicalize_url(url)
+        if canonical is None or not self._scope.allows(canonical):
+            return
+        if not self._seen.add(canonical):
+            self._stats["duplicates"] += 1
+            return
+
+        # DNS resolution is blocking - keep it off the event loop
+        is_blocked, reason = await asyncio.to_thread(SSRFProtection.is_blocked, canonical)
+        if is_blocked:
+            self._stats["blocked"] += 1
+            await self._events.put(("skipped", {"url": canonical, "reason": reason}))
+            return
+
+        self._stats["discovered"] += 1
+        await self._frontier.put((canonical, depth))
+
+    async def _worker(self) -> None:
+        while True:
+            url, depth = await self._frontier.get()
+            try:
+                if self._stats["pages"] >= self._request.max_pages:
+                    continue
+                self._stats["pages"] += 1
+
+                try:
+                    result = await browser_manager.browse(self._page_request(url), self._tenant)
+                except Exception as e:
+                    self._stats["failed"] += 1
+                    await self._events.put(("page_error", {
+                        "url": url,
+                        "depth": depth,
+                        "error_type": type(e).__name__,
+                        "message": str(e),
+                    }))
+                    continue
+
+                links = result.links or []
+                await self._events.put(("page", {
+                    "depth": depth,
+                    **result.model_dump(exclude={"links"}, exclude_none=True),
+                    "links_found": len(links),
+                }))
+
+                if depth < self._request.max_depth:
+                    for link in links:
+                        await self._enqueue(link, depth + 1)
+            finally:
+                self._frontier.task_done()
+
+    async def run(self) -> AsyncIterator[tuple[str, dict]]:
+        """Run the crawl, yielding (event, data) pairs as pages complete."""
+        for seed in self._request.seeds:
+            await self._enqueue(seed, 0)
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self._request.concurrency)]
+        drained = asyncio.create_task(self._frontier.join())
+        try:
+            while True:
+                next_event = asyncio.create_task(self._events.get())
+                done, _ = await asyncio.wait(
+                    {next_event, drained}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_event in done:
+                    yield next_event.result()
+                    continue
+                next_event.cancel()
+                # Frontier drained - flush remaining events and finish
+                while not self._events.empty():
+                    yield self._events.get_nowait()
+                break
+        finally:
+            # Also runs when the client disconnects: stop all in-flight pages
+            drained.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        logger.info("Crawl finished", **self._stats)
+        yield "done", dict(self._stats)
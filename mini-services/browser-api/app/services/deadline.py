@@ -0,0 +1,66 @@
+"""
+Deadline - End-to-end time budget shared by every phase of a request.
+"""
+import asyncio
+import time
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out; `phase` names the step it ran out in."""
+
+    def __init__(self, phase: str):
+        super().__init__(f"Deadline exceeded during {phase}")
+        self.phase = phase
+
+
+class Deadline:
+    """
+    A fixed point in time by which a request must finish. Created when
+    the request is accepted and handed down through queueing, context
+    creation, navigation, waits and extraction, so each step only gets
+    what the previous ones left over.
+    """
+
+    def __init__(self, timeout_ms: int):
+        self.timeout_ms = timeout_ms
+        self._started = time.monotonic()
+        self._expires = self._started + timeout_ms / 1000
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left (never negative)."""
+        return max(0.0, self._expires - time.monotonic())
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self._started) * 1000
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires
+
+    def check(self, phase: str) -> None:
+        """Raise if the budget is already spent before starting `phase`."""
+        if self.expired:
+            raise DeadlineExceeded(phase)
+
+    def budget_ms(self, phase: str, reserve_ms: float = 0) -> int:
+        """
+        Remaining budget in ms for a Playwright `timeout=` argument,
+        optionally keeping `reserve_ms` back for later steps. Never 0,
+        which Playwright would read as "no timeout".
+        """
+        self.check(phase)
+        return max(1, int(self.remaining * 1000 - reserve_ms))
+
+    async def run(self, awaitable: Awaitable[T], phase: str) -> T:
+        """Await `awaitable`, cancelling it if the budget runs out."""
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining)
+        except asyncio.TimeoutError as e:
+            if isinstance(e, DeadlineExceeded):
+                raise  # A nested step already ran out (Python 3.11+ aliases the two)
+            raise DeadlineExceeded(phase) from None
@@ -0,0 +1,151 @@
+"""
+Fair Queue - Weighted fair admission to browser slots across tenants.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from .deadline import Deadline, DeadlineExceeded
+from .tenants import Tenant
+
+
+class _TenantQueue:
+    """Waiters and accounting for a single tenant."""
+
+    def __init__(self, tenant: Tenant):
+        self.tenant = tenant
+        self.waiters: deque[tuple[float, float, asyncio.Future]] = deque()
+        self.active: int = 0
+        self.last_finish: float = 0.0
+        self.served: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+
+
+class FairScheduler:
+    """
+    Start-time fair queueing over a fixed number of browser slots.
+    Each tenant gets its own FIFO; a waiter is tagged with a virtual
+    start time advanced by 1/weight, and freed slots go to the eligible
+    waiter with the smallest tag. Tenants at their concurrency cap are
+    skipped, so one tenant's burst cannot starve the others.
+    """
+
+    def __init__(self, slots: int):
+        self._slots = slots
+        self._active: int = 0
+        self._virtual_time: float = 0.0
+        self._queues: dict[str, _TenantQueue] = {}
+
+    @property
+    def queued(self) -> int:
+        return sum(self._depth(q) for q in self._queues.values())
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def tenant_metrics(self) -> dict[str, dict]:
+        """Per-tenant queue depth, active slots and wait times, by tenant id."""
+        return {
+            q.tenant.id: {
+                "key_prefix": q.tenant.key_prefix,
+                "plan": q.tenant.plan.id,
+                "queue_depth": self._depth(q),
+                "active": q.active,
+                "served": q.served,
+                "average_wait_ms": (q.total_wait / q.served * 1000) if q.served else 0,
+                "max_wait_ms": q.max_wait * 1000,
+            }
+            for q in self._queues.values()
+        }
+
+    @staticmethod
+    def _depth(queue: _TenantQueue) -> int:
+        return sum(1 for _, _, future in queue.waiters if not future.done())
+
+    def _queue(self, tenant: Tenant) -> _TenantQueue:
+        queue = self._queues.get(tenant.id)
+        if queue is None:
+            queue = self._queues[tenant.id] = _TenantQueue(tenant)
+        queue.tenant = tenant
+        return queue
+
+    def _next_tag(self, queue: _TenantQueue) -> float:
+        tag = max(self._virtual_time, queue.last_finish)
+        queue.last_finish = tag + 1 / queue.tenant.weight
+        return tag
+
+    def _grant(self, queue: _TenantQueue, enqueued: float) -> None:
+        wait = time.monotonic() - enqueued
+        queue.active += 1
+        queue.served += 1
+        queue.total_wait += wait
+        queue.max_wait = max(queue.max_wait, wait)
+        self._active += 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the eligible waiters with the lowest tags."""
+        while self._active < self._slots:
+            best = None
+            for queue in self._queues.values():
+                while queue.waiters and queue.waiters[0][2].done():
+                    queue.waiters.popleft()
+                if not queue.waiters or queue.active >= queue.tenant.max_concurrency:
+                    continue
+                if best is None or queue.waiters[0][0] < best.waiters[0][0]:
+                    best = queue
+            if best is None:
+                return
+
+            tag, enqueued, future = best.waiters.popleft()
+            self._virtual_time = max(self._virtual_time, tag)
+            future.set_result(None)
+            self._grant(best, enqueued)
+
+    @asynccontextmanager
+    async def acquire(self, tenant: Tenant, deadline: Optional[Deadline] = None):
+        """
+        Wait for a browser slot on behalf of a tenant.
+        Raises DeadlineExceeded if `deadline` runs out while queued.
+        """
+        queue = self._queue(tenant)
+        enqueued = time.monotonic()
+
+        if (
+            self.queued == 0
+            and self._active < self._slots
+            and queue.active < tenant.max_concurrency
+        ):
+            self._next_tag(queue)
+            self._grant(queue, enqueued)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            queue.waiters.append((self._next_tag(queue), enqueued, future))
+            self._dispatch()
+            try:
+                if deadline:
+                    await deadline.run(future, "queue wait")
+                else:
+                    await future
+            except (asyncio.CancelledError, DeadlineExceeded):
+                if future.done() and not future.cancelled():
+                    # Slot was granted as we were cancelled - give it back
+                    self._release(queue)
+                else:
+                    future.cancel()
+                    self._dispatch()
+                raise
+
+        try:
+            yield
+        finally:
+            self._release(queue)
+
+    def _release(self, queue: _TenantQueue) -> None:
+        queue.active -= 1
+        self._active -= 1
+        self._dispatch()
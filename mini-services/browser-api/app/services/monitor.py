@@ -0,0 +1,298 @@
+"""
+Change Monitor - Fingerprint pages and report only what changed.
+"""
+import asyncio
+import difflib
+import hashlib
+import re
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from typing import Optional
+
+import httpx
+import structlog
+
+from ..config import settings
+from ..models.schemas import BrowseRequest, MonitorRequest, MonitorResponse
+from .browser import DEFAULT_USER_AGENT, SSRFProtection, browser_manager
+from .crawler import canonicalize_url
+from .deadline import Deadline, DeadlineExceeded
+from .scheduler import domain_scheduler
+from .tenants import Tenant
+
+logger = structlog.get_logger()
+
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Rough per-fingerprint overhead (key, hashes, validators) on top of the text
+FINGERPRINT_OVERHEAD_BYTES = 256
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, one line per block of text."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            text = " ".join(data.split())
+            if text:
+                self.lines.append(text)
+
+
+def extract_text(html: str) -> list[str]:
+    """Visible text lines of an HTML document."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.lines
+
+
+def simhash(lines: list[str]) -> int:
+    """64-bit SimHash over word tokens."""
+    weights = [0] * 64
+    for word in WORD_RE.findall(" ".join(lines).lower()):
+        value = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def similarity(a: int, b: int) -> float:
+    """Similarity of two SimHashes (1.0 = identical)."""
+    return 1 - bin(a ^ b).count("1") / 64
+
+
+class Fingerprint:
+    """Compact record of the last version seen for a URL."""
+
+    __slots__ = ("content_hash", "simhash", "etag", "last_modified", "text", "checked_at")
+
+    def __init__(
+        self,
+        content_hash: str,
+        simhash: int,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        text: bytes,
+    ):
+        self.content_hash = content_hash
+        self.simhash = simhash
+        self.etag = etag
+        self.last_modified = last_modified
+        self.text = text  # zlib-compressed extracted text, for diffs
+        self.checked_at = datetime.now(timezone.utc)
+
+    @property
+    def size(self) -> int:
+        return len(self.text) + FINGERPRINT_OVERHEAD_BYTES
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    @property
+    def lines(self) -> list[str]:
+        return zlib.decompress(self.text).decode("utf-8").split("\n")
+
+
+def _fingerprint(
+    html: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+) -> tuple[list[str], Fingerprint]:
+    """Extract the text of a rendered page and fingerprint it."""
+    lines = extract_text(html)
+    text = "\n".join(lines).encode("utf-8")
+    return lines, Fingerprint(
+        content_hash=hashlib.sha256(text).hexdigest(),
+        simhash=simhash(lines),
+        etag=etag,
+        last_modified=last_modified,
+        text=zlib.compress(text),
+    )
+
+
+def _diff(previous: Fingerprint, lines: list[str], max_lines: int) -> tuple[str, bool]:
+    """Unified diff against the previous version, and whether it was truncated."""
+    diff = list(difflib.unified_diff(previous.lines, lines, lineterm="", n=1))[2:]
+    return "\n".join(diff[:max_lines]), len(diff) > max_lines
+
+
+class ChangeMonitor:
+    """
+    Stores a fingerprint (content hash + SimHash of the extracted text)
+    per tenant and URL in an LRU bounded by size. When the origin sent an
+    ETag or Last-Modified, a check first tries a cheap conditional request;
+    only when the origin does not answer 304 is the page rendered, and then
+    only a diff against the previous version is returned.
+    """
+
+    def __init__(self, max_bytes: int = settings.monitor_max_mb * 1024 * 1024):
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._fingerprints: OrderedDict[tuple[str, str], Fingerprint] = OrderedDict()
+
+    def _get(self, key: tuple[str, str]) -> Optional[Fingerprint]:
+        fingerprint = self._fingerprints.get(key)
+        if fingerprint is not None:
+            self._fingerprints.move_to_end(key)
+        return fingerprint
+
+    def _put(self, key: tuple[str, str], fingerprint: Fingerprint) -> None:
+        previous = self._fingerprints.pop(key, None)
+        if previous:
+            self._bytes -= previous.size
+        self._fingerprints[key] = fingerprint
+        self._bytes += fingerprint.size
+        while self._bytes > self._max_bytes and len(self._fingerprints) > 1:
+            _, evicted = self._fingerprints.popitem(last=False)
+            self._bytes -= evicted.size
+
+    async def _probe(
+        self,
+        request: MonitorRequest,
+        previous: Optional[Fingerprint],
+    ) -> tuple[bool, Optional[str], Optional[str]]:
+        """
+        Conditional GET (headers only). Returns (not_modified, etag, last_modified).
+        Goes through the domain scheduler like any other request to the
+        origin. Failures are not fatal - the page is simply rendered, and
+        the previous validators are kept for the next check.
+        """
+        kept = (previous.etag, previous.last_modified) if previous else (None, None)
+        headers = {"User-Agent": request.user_agent or DEFAULT_USER_AGENT, **(request.headers or {})}
+        if previous and previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous and previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+
+        proxy = None
+        if request.proxy_config:
+            proxy = httpx.Proxy(
+                request.proxy_config.server,
+                auth=(request.proxy_config.username, request.proxy_config.password)
+                if request.proxy_config.username else None,
+            )
+
+        deadline = Deadline(settings.monitor_probe_timeout_ms)
+        try:
+            async with domain_scheduler.acquire(request.url, deadline):
+                await domain_scheduler.pace(request.url, deadline)
+                async with httpx.AsyncClient(
+                    proxy=proxy,
+                    timeout=max(deadline.remaining, 0.001),
+                    follow_redirects=False,  # redirects are re-checked by the renderer
+                    verify=False,
+                ) as client:
+                    async with client.stream("GET", request.url, headers=headers) as response:
+                        if response.status_code in (429, 503):
+                            domain_scheduler.backoff(
+                                request.url, response.headers.get("retry-after")
+                            )
+                        if response.status_code == 304 and previous:
+                            return True, previous.etag, previous.last_modified
+                        if response.status_code != 200:
+                            return (False, *kept)
+                        return (
+                            False,
+                            response.headers.get("etag"),
+                            response.headers.get("last-modified"),
+                        )
+        except (httpx.HTTPError, DeadlineExceeded, ImportError) as e:
+            # ImportError: SOCKS proxies need the optional httpx[socks] extra
+            logger.debug(f"Conditional probe failed for {request.url}: {e}")
+            return (False, *kept)
+
+    async def check(self, request: MonitorRequest, tenant: Tenant) -> MonitorResponse:
+        """Check a URL for changes since the tenant's previous check."""
+        start_time = time.time()
+        key = (tenant.id, canonicalize_url(request.url) or request.url)
+        previous = self._get(key)
+
+        # Conditional probe goes around the browser, so it needs its own SSRF check
+        is_blocked, reason = await asyncio.to_thread(SSRFProtection.is_blocked, request.url)
+        if is_blocked:
+            raise ValueError(f"URL blocked: {reason}")
+
+        # Probe the first check to learn the validators, later ones only if
+        # the origin sent any - otherwise a 304 is impossible
+        not_modified, etag, last_modified = False, None, None
+        if previous is None or previous.has_validators:
+            not_modified, etag, last_modified = await self._probe(request, previous)
+        if not_modified and previous:
+            previous.checked_at = datetime.now(timezone.utc)
+            return MonitorResponse(
+                status="unchanged",
+                url=request.url,
+                checked_via="conditional",
+                content_hash=previous.content_hash,
+                simhash=f"{previous.simhash:016x}",
+                similarity=1.0,
+                execution_time_ms=(time.time() - start_time) * 1000,
+            )
+
+        result = await browser_manager.browse(
+            BrowseRequest(
+                url=request.url,
+                action="render",
+                wait_for=request.wait_for,
+                execute_js=request.execute_js,
+                timeout=request.timeout,
+                user_agent=request.user_agent,
+                headers=request.headers,
+                proxy_config=request.proxy_config,
+            ),
+            tenant,
+        )
+
+        # Parsing and hashing a large DOM takes a while - keep it off the event loop
+        lines, current = await asyncio.to_thread(
+            _fingerprint, result.content or "", etag, last_modified
+        )
+        self._put(key, current)
+
+        response = MonitorResponse(
+            status="new",
+            url=request.url,
+            final_url=result.final_url,
+            checked_via="render",
+            content_hash=current.content_hash,
+            simhash=f"{current.simhash:016x}",
+            status_code=result.status_code,
+            page_title=result.page_title,
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
+        if previous is None:
+            return response
+
+        response.similarity = similarity(previous.simhash, current.simhash)
+        if previous.content_hash == current.content_hash:
+            response.status = "unchanged"
+            response.similarity = 1.0
+            return response
+
+        response.status = "changed"
+        response.diff, response.diff_truncated = await asyncio.to_thread(
+            _diff, previous, lines, request.max_diff_lines
+        )
+        return response
+
+
+# Global change monitor instance
+change_monitor = ChangeMonitor()
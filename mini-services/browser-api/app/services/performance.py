@@ -0,0 +1,160 @@
+"""
+Performance Capture - Network waterfall and Chromium metrics for a page.
+"""
+import asyncio
+from typing import Optional
+
+import structlog
+from playwright.async_api import CDPSession, Page, Request, Error as PlaywrightError
+
+from ..config import settings
+from ..models.schemas import NetworkEntry, NetworkTimings, PerformanceCapture, PerformanceMetrics
+
+logger = structlog.get_logger()
+
+MAX_URL_LENGTH = 512
+
+# Upper bound on waiting for in-flight size lookups when collecting
+COLLECT_TIMEOUT_S = 2.0
+
+
+def _span(start: float, end: float) -> float:
+    """Duration between two Resource Timing marks, -1 when either is missing."""
+    return end - start if start >= 0 and end >= 0 else -1
+
+
+def har_timings(timing: dict) -> NetworkTimings:
+    """Convert Playwright's Resource Timing marks into HAR-style phases."""
+    return NetworkTimings(
+        dns=_span(timing["domainLookupStart"], timing["domainLookupEnd"]),
+        connect=_span(timing["connectStart"], timing["connectEnd"]),
+        ssl=_span(timing["secureConnectionStart"], timing["connectEnd"]),
+        wait=_span(timing["requestStart"], timing["responseStart"]),
+        receive=_span(timing["responseStart"], timing["responseEnd"]),
+    )
+
+
+class PerformanceRecorder:
+    """
+    Records a HAR-style waterfall from Playwright request events and reads
+    Chromium's performance counters over CDP. Timing data is already
+    gathered by the browser, so recording costs one size lookup per
+    finished request (up to `max_entries`) and one CDP call at the end.
+    """
+
+    def __init__(self, page: Page, max_entries: int = settings.performance_max_entries):
+        self._page = page
+        self._max_entries = max_entries
+        self._entries: list[NetworkEntry] = []
+        self._pending: set[asyncio.Task] = set()
+        self._seen = 0
+        self._session: Optional[CDPSession] = None
+        self._listening = False
+        self._capture: Optional[PerformanceCapture] = None
+
+    async def start(self) -> None:
+        """Attach to the page; call before navigating."""
+        self._page.on("requestfinished", self._on_finished)
+        self._page.on("requestfailed", self._on_failed)
+        self._listening = True
+        try:
+            self._session = await self._page.context.new_cdp_session(self._page)
+            await self._session.send("Performance.enable")
+        except PlaywrightError as e:
+            logger.warning(f"Performance metrics unavailable: {e}")
+            self._session = None
+
+    def _admit(self) -> bool:
+        self._seen += 1
+        return self._seen <= self._max_entries
+
+    def _on_finished(self, request: Request) -> None:
+        if self._admit():
+            task = asyncio.create_task(self._record(request))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def _on_failed(self, request: Request) -> None:
+        if self._admit():
+            self._entries.append(self._entry(request, failure=request.failure))
+
+    def _entry(self, request: Request, **fields) -> NetworkEntry:
+        timing = request.timing
+        return NetworkEntry(
+            url=request.url[:MAX_URL_LENGTH],
+            method=request.method,
+            resource_type=request.resource_type,
+            started_ms=timing["startTime"],  # epoch ms, made relative in collect()
+            duration_ms=timing["responseEnd"],
+            timings=har_timings(timing),
+            **fields,
+        )
+
+    async def _record(self, request: Request) -> None:
+        status = None
+        request_bytes = response_bytes = None
+        try:
+            response = await request.response()
+            status = response.status if response else None
+            sizes = await request.sizes()
+            request_bytes = sizes["requestHeadersSize"] + sizes["requestBodySize"]
+            response_bytes = sizes["responseHeadersSize"] + sizes["responseBodySize"]
+        except PlaywrightError:
+            pass  # Page or context closed mid-lookup
+        self._entries.append(self._entry(
+            request, status=status, request_bytes=request_bytes, response_bytes=response_bytes,
+        ))
+
+    async def _metrics(self) -> Optional[PerformanceMetrics]:
+        if not self._session:
+            return None
+        try:
+            result = await self._session.send("Performance.getMetrics")
+        except PlaywrightError as e:
+            logger.warning(f"Performance.getMetrics failed: {e}")
+            return None
+        values = {m["name"]: m["value"] for m in result.get("metrics", [])}
+        dom_content_loaded = None
+        if values.get("DomContentLoaded") and values.get("NavigationStart"):
+            dom_content_loaded = (values["DomContentLoaded"] - values["NavigationStart"]) * 1000
+        return PerformanceMetrics(
+            script_duration_ms=values.get("ScriptDuration", 0) * 1000,
+            layout_duration_ms=values.get("LayoutDuration", 0) * 1000,
+            recalc_style_duration_ms=values.get("RecalcStyleDuration", 0) * 1000,
+            task_duration_ms=values.get("TaskDuration", 0) * 1000,
+            js_heap_used_mb=values.get("JSHeapUsedSize", 0) / 1024 / 1024,
+            js_heap_total_mb=values.get("JSHeapTotalSize", 0) / 1024 / 1024,
+            dom_nodes=int(values.get("Nodes", 0)),
+            documents=int(values.get("Documents", 0)),
+            layout_count=int(values.get("LayoutCount", 0)),
+            dom_content_loaded_ms=dom_content_loaded,
+        )
+
+    async def collect(self) -> PerformanceCapture:
+        """
+        Finish recording and return the capture; call before the page closes.
+        Safe to call again (e.g. for a partial result after a collect that
+        ran out of time) - listeners are only detached once.
+        """
+        if self._capture:
+            return self._capture
+        if self._listening:
+            self._listening = False
+            self._page.remove_listener("requestfinished", self._on_finished)
+            self._page.remove_listener("requestfailed", self._on_failed)
+        if self._pending:
+            await asyncio.wait(set(self._pending), timeout=COLLECT_TIMEOUT_S)
+            for task in list(self._pending):
+                task.cancel()
+        metrics = await self._metrics()
+
+        entries = sorted(self._entries, key=lambda e: e.started_ms)
+        origin = entries[0].started_ms if entries else 0.0
+        for entry in entries:
+            entry.started_ms -= origin
+        self._capture = PerformanceCapture(
+            entries=entries,
+            dropped_entries=max(0, self._seen - self._max_entries),
+            metrics=metrics,
+        )
+        return self._capture
@@ -0,0 +1,228 @@
+"""
+Domain Scheduler - Per-target-domain politeness and concurrency control.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlparse
+
+import structlog
+
+from ..config import settings
+from .deadline import Deadline, DeadlineExceeded
+
+logger = structlog.get_logger()
+
+# How often acquire()/backoff() sweep the table for expired idle domains
+SWEEP_INTERVAL_S = 1.0
+
+# Common multi-label public suffixes (no PSL dependency)
+MULTI_LABEL_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "ltd.uk", "plc.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "co.jp", "ne.jp", "or.jp", "co.kr", "co.in",
+    "com.br", "com.cn", "com.mx", "com.tr", "com.sg", "com.hk", "co.za",
+}
+
+
+def registered_domain(url: str) -> str:
+    """Return the registrable domain (eTLD+1) for a URL."""
+    hostname = (urlparse(url).hostname or "").lower().rstrip(".")
+    labels = hostname.split(".")
+    if len(labels) <= 2 or hostname.replace(".", "").isdigit():
+        return hostname
+    if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class DomainThrottled(DeadlineExceeded):
+    """The domain is backed off (Retry-After) for longer than the request has left."""
+
+    def __init__(self, domain: str, blocked_for: float):
+        super().__init__("domain politeness wait")
+        self.domain = domain
+        self.blocked_for = blocked_for
+
+    def __str__(self) -> str:
+        return (
+            f"Target {self.domain} is throttled for another {self.blocked_for:.1f}s, "
+            f"beyond the request deadline"
+        )
+
+
+class _DomainState:
+    """Admission state for a single registered domain."""
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.lock = asyncio.Lock()
+        self.next_slot: float = 0.0
+        self.blocked_until: float = 0.0
+        self.users: int = 0
+
+
+class DomainScheduler:
+    """
+    Politeness gate placed in front of browser context creation.
+    Caps concurrent work per registered domain, spaces consecutive
+    requests by a minimum interval and honors target Retry-After.
+    Waiting happens per domain, so other domains keep being admitted.
+
+    acquire() is the concurrency gate; pace() is called right before a
+    request actually goes out (after the browser slot is granted), so
+    requests that sat in the fair queue together still leave spaced apart
+    and a 429 received meanwhile still holds them back.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.domain_max_concurrency,
+        min_interval_ms: int = settings.domain_min_interval_ms,
+        max_retry_after_s: int = settings.domain_max_retry_after_s,
+    ):
+        self._max_concurrency = max_concurrency
+        self._min_interval = min_interval_ms / 1000
+        self._max_retry_after = max_retry_after_s
+        self._domains: dict[str, _DomainState] = {}
+        self._last_sweep = 0.0
+
+    @property
+    def throttled_domains(self) -> dict[str, float]:
+        """Domains currently blocked by Retry-After, with seconds remaining."""
+        now = time.monotonic()
+        return {
+            domain: round(state.blocked_until - now, 3)
+            for domain, state in self._domains.items()
+            if state.blocked_until > now
+        }
+
+    def _check_throttle(self, domain: str, state: _DomainState, deadline: Optional[Deadline]) -> None:
+        """Fail fast instead of waiting out a backoff the deadline cannot cover."""
+        blocked_for = state.blocked_until - time.monotonic()
+        if deadline and blocked_for > deadline.remaining:
+            raise DomainThrottled(domain, blocked_for)
+
+    async def _admit(self, domain: str, state: _DomainState, deadline: Optional[Deadline]) -> None:
+        """Take a concurrency slot, then wait out any backoff."""
+        self._check_throttle(domain, state, deadline)
+        await state.semaphore.acquire()
+        try:
+            while True:
+                self._check_throttle(domain, state, deadline)
+                wait = state.blocked_until - time.monotonic()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+        except BaseException:
+            state.semaphore.release()
+            raise
+
+    async def _space(self, domain: str, state: _DomainState, deadline: Optional[Deadline]) -> None:
+        """Wait out the interval and any backoff, then claim the next send slot."""
+        async with state.lock:
+            while True:
+                self._check_throttle(domain, state, deadline)
+                now = time.monotonic()
+                wait = max(state.next_slot, state.blocked_until) - now
+                if wait <= 0:
+                    state.next_slot = now + self._min_interval
+                    return
+                await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def acquire(self, url: str, deadline: Optional[Deadline] = None):
+        """
+        Wait for a concurrency slot on the URL's registered domain.
+        Raises DeadlineExceeded if `deadline` runs out while waiting, or
+        DomainThrottled right away if the domain is backed off past it.
+        """
+        domain = registered_domain(url)
+        state = self._state(domain)
+        state.users += 1
+
+        try:
+            if deadline:
+                await deadline.run(self._admit(domain, state, deadline), "domain politeness wait")
+            else:
+                await self._admit(domain, state, None)
+            try:
+                yield domain
+            finally:
+                state.semaphore.release()
+        finally:
+            state.users -= 1
+            self._prune(domain, state)
+
+    async def pace(self, url: str, deadline: Optional[Deadline] = None) -> None:
+        """
+        Space a request from the previous one to its domain; call inside
+        acquire(), right before the request goes out.
+        """
+        domain = registered_domain(url)
+        state = self._state(domain)
+        state.users += 1
+        try:
+            if deadline:
+                await deadline.run(self._space(domain, state, deadline), "domain politeness wait")
+            else:
+                await self._space(domain, state, None)
+        finally:
+            state.users -= 1
+            self._prune(domain, state)
+
+    def backoff(self, url: str, retry_after: Optional[str]) -> None:
+        """Block a domain after a 429/503 response from the target."""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self._min_interval * 10
+        delay = min(delay, self._max_retry_after)
+
+        domain = registered_domain(url)
+        state = self._state(domain)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+        logger.warning(f"Target throttled {domain}, backing off for {delay:.1f}s")
+
+    def _state(self, domain: str) -> _DomainState:
+        self._sweep()
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _DomainState(self._max_concurrency)
+        return state
+
+    def _prune(self, domain: str, state: _DomainState) -> None:
+        """Drop idle domain state so the table does not grow unbounded."""
+        if state.users == 0 and max(state.next_slot, state.blocked_until) <= time.monotonic():
+            self._domains.pop(domain, None)
+
+    def _sweep(self) -> None:
+        """
+        Prune every expired idle domain. _prune on release misses domains
+        still inside their interval at that point and domains only ever
+        touched by backoff().
+        """
+        now = time.monotonic()
+        if now - self._last_sweep < SWEEP_INTERVAL_S:
+            return
+        self._last_sweep = now
+        for domain, state in list(self._domains.items()):
+            self._prune(domain, state)
+
+
+# Global domain scheduler instance
+domain_scheduler = DomainScheduler()
@@ -0,0 +1,162 @@
+"""
+Tenant Registry - API keys and plans loaded from a local snapshot.
+"""
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Optional
+
+import structlog
+from pydantic import BaseModel, Field
+
+from ..config import settings
+
+logger = structlog.get_logger()
+
+# Scheduling defaults per plan tier (overridable via plans.features)
+PLAN_WEIGHTS = {"free": 1, "starter": 2, "growth": 4, "scale": 8}
+PLAN_MAX_CONCURRENCY = {"free": 1, "starter": 1, "growth": 2, "scale": 3}
+
+ANONYMOUS_TENANT_ID = "anonymous"
+UNKNOWN_KEY_TENANT_ID = "unknown-key"
+
+
+class Plan(BaseModel):
+    """Subset of the `plans` table relevant to scheduling."""
+    id: str
+    name: str = ""
+    requests_per_minute: int = 0
+    features: dict[str, Any] = Field(default_factory=dict)
+
+    @property
+    def weight(self) -> float:
+        return float(self.features.get("weight", PLAN_WEIGHTS.get(self.id, 1)))
+
+    @property
+    def max_concurrency(self) -> int:
+        return int(self.features.get("max_concurrency", PLAN_MAX_CONCURRENCY.get(self.id, 1)))
+
+
+class Tenant(BaseModel):
+    """A resolved API key with its plan."""
+    id: str
+    user_id: Optional[str] = None
+    key_prefix: str
+    plan: Plan
+
+    @property
+    def weight(self) -> float:
+        return self.plan.weight
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.plan.max_concurrency
+
+
+def hash_api_key(raw_key: str) -> str:
+    """Hash an API key the same way the dashboard stores it (sha256 hex)."""
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+
+class TenantRegistry:
+    """
+    Resolves API keys to tenants using a local snapshot of the Supabase
+    `api_keys`, `subscriptions` and `plans` tables (JSON file or SQLite).
+    Missing keys map to an anonymous tenant on the default plan; keys not
+    in the snapshot share one tenant held to the default plan's limits.
+    """
+
+    def __init__(self, snapshot_path: str = settings.tenant_snapshot_path):
+        self._snapshot_path = snapshot_path
+        self._plans: dict[str, Plan] = {}
+        self._tenants: dict[str, Tenant] = {}
+        self._loaded = False  # Keys can only be told apart once a snapshot loaded
+        self._anonymous = self._make_anonymous()
+        self._unknown = self._make_unknown()
+
+    def _make_anonymous(self) -> Tenant:
+        plan = self._plans.get(settings.default_plan) or Plan(id=settings.default_plan)
+        # Keyless traffic shares one queue, so it is not held to a single key's cap
+        plan = plan.model_copy(update={
+            "features": {**plan.features, "max_concurrency": settings.anonymous_max_concurrency},
+        })
+        return Tenant(id=ANONYMOUS_TENANT_ID, key_prefix=ANONYMOUS_TENANT_ID, plan=plan)
+
+    def _make_unknown(self) -> Tenant:
+        # Never more than a valid key on the default plan, so sending a
+        # made-up key does not buy extra concurrency
+        plan = self._plans.get(settings.default_plan) or Plan(id=settings.default_plan)
+        return Tenant(id=UNKNOWN_KEY_TENANT_ID, key_prefix=UNKNOWN_KEY_TENANT_ID, plan=plan)
+
+    def load(self) -> None:
+        """(Re)load the snapshot from disk."""
+        if not self._snapshot_path:
+            logger.info("No tenant snapshot configured, all requests are anonymous")
+            return
+
+        path = Path(self._snapshot_path)
+        if path.suffix in (".db", ".sqlite", ".sqlite3"):
+            snapshot = self._read_sqlite(path)
+        else:
+            snapshot = json.loads(path.read_text())
+
+        plans = {p["id"]: Plan(**p) for p in snapshot.get("plans", [])}
+        plan_by_user = {
+            s["user_id"]: s["plan_id"]
+            for s in snapshot.get("subscriptions", [])
+            if s.get("status", "active") == "active"
+        }
+
+        tenants = {}
+        for key in snapshot.get("api_keys", []):
+            if not key.get("is_active", True):
+                continue
+            plan_id = key.get("plan_id") or plan_by_user.get(key.get("user_id"), settings.default_plan)
+            tenants[key["key_hash"]] = Tenant(
+                id=str(key["id"]),
+                user_id=key.get("user_id"),
+                key_prefix=key["key_prefix"],
+                plan=plans.get(plan_id) or Plan(id=plan_id),
+            )
+
+        self._plans = plans
+        self._tenants = tenants
+        self._anonymous = self._make_anonymous()
+        self._unknown = self._make_unknown()
+        self._loaded = True
+        logger.info(f"Loaded {len(tenants)} API keys and {len(plans)} plans from {path}")
+
+    @staticmethod
+    def _read_sqlite(path: Path) -> dict[str, list[dict]]:
+        """Read the snapshot tables from a SQLite copy of the schema."""
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            snapshot = {}
+            for table in ("plans", "api_keys", "subscriptions"):
+                try:
+                    rows = conn.execute(f"SELECT * FROM {table}").fetchall()
+                except sqlite3.OperationalError:
+                    rows = []
+                snapshot[table] = [dict(row) for row in rows]
+            for plan in snapshot["plans"]:
+                if isinstance(plan.get("features"), str):
+                    plan["features"] = json.loads(plan["features"])
+            return snapshot
+        finally:
+            conn.close()
+
+    @property
+    def anonymous(self) -> Tenant:
+        return self._anonymous
+
+    def resolve(self, api_key: Optional[str]) -> Tenant:
+        """Resolve a raw API key to its tenant."""
+        if not api_key or not self._loaded:
+            return self._anonymous  # Without a snapshot no key can be told apart
+        return self._tenants.get(hash_api_key(api_key), self._unknown)
+
+
+# Global tenant registry instance
+tenant_registry = TenantRegistry()
@@ -0,0 +1,430 @@
+"""
+Usage Recorder - Write-behind batching into usage_logs/monthly_usage.
+"""
+import asyncio
+import json
+import sqlite3
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import structlog
+
+from ..config import settings
+from .tenants import ANONYMOUS_TENANT_ID, UNKNOWN_KEY_TENANT_ID, Tenant
+
+logger = structlog.get_logger()
+
+# SQLSTATE classes worth retrying: connection exception, transaction
+# rollback, insufficient resources, operator intervention, system error
+TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57", "58")
+
+
+class SQLiteUsageBackend:
+    """Local SQLite stand-in for the Supabase usage tables."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS usage_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        api_key_id TEXT,
+        request_type TEXT NOT NULL,
+        url TEXT NOT NULL,
+        status_code INTEGER,
+        execution_time_ms REAL,
+        response_bytes INTEGER,
+        created_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS monthly_usage (
+        user_id TEXT NOT NULL,
+        year_month TEXT NOT NULL,
+        request_count INTEGER DEFAULT 0,
+        success_count INTEGER DEFAULT 0,
+        failed_count INTEGER DEFAULT 0,
+        total_execution_time_ms REAL DEFAULT 0,
+        UNIQUE(user_id, year_month)
+    );
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    async def connect(self) -> None:
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.executescript(self.SCHEMA)
+
+    async def write(self, logs: list[dict], monthly: list[dict]) -> None:
+        await asyncio.to_thread(self._write, logs, monthly)
+
+    @staticmethod
+    def is_transient(error: Exception) -> bool:
+        """Locked or unavailable database files clear up; constraint errors do not."""
+        return isinstance(error, (OSError, asyncio.TimeoutError, sqlite3.OperationalError))
+
+    def _write(self, logs: list[dict], monthly: list[dict]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO usage_logs (user_id, api_key_id, request_type, url, status_code, "
+                "execution_time_ms, response_bytes, created_at) VALUES (:user_id, :api_key_id, "
+                ":request_type, :url, :status_code, :execution_time_ms, :response_bytes, :created_at)",
+                logs,
+            )
+            self._conn.executemany(
+                "INSERT INTO monthly_usage (user_id, year_month, request_count, success_count, "
+                "failed_count, total_execution_time_ms) VALUES (:user_id, :year_month, "
+                ":request_count, :success_count, :failed_count, :total_execution_time_ms) "
+                "ON CONFLICT (user_id, year_month) DO UPDATE SET "
+                "request_count = request_count + excluded.request_count, "
+                "success_count = success_count + excluded.success_count, "
+                "failed_count = failed_count + excluded.failed_count, "
+                "total_execution_time_ms = total_execution_time_ms + excluded.total_execution_time_ms",
+                monthly,
+            )
+
+    async def close(self) -> None:
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+
+class PostgresUsageBackend:
+    """Postgres/Supabase backend (requires the optional asyncpg package)."""
+
+    def __init__(self, dsn: str):
+        self._dsn = dsn
+        self._pool = None
+
+    @property
+    def connected(self) -> bool:
+        return self._pool is not None
+
+    async def connect(self) -> None:
+        import asyncpg
+        self._pool = await asyncpg.create_pool(self._dsn, min_size=1, max_size=2)
+
+    @staticmethod
+    def is_transient(error: Exception) -> bool:
+        """Connection and availability errors are retried; data errors are not."""
+        if isinstance(error, (OSError, asyncio.TimeoutError)):
+            return True
+        try:
+            import asyncpg
+        except ImportError:
+            return True  # Cannot tell - keep the batch for replay
+        if isinstance(error, asyncpg.PostgresError):
+            return (error.sqlstate or "")[:2] in TRANSIENT_SQLSTATE_CLASSES
+        # Closed connections and pools; asyncpg's DataError is also a ValueError
+        return isinstance(error, asyncpg.InterfaceError) and not isinstance(error, ValueError)
+
+    async def write(self, logs: list[dict], monthly: list[dict]) -> None:
+        # Anonymous and unknown-key traffic has no auth.users row to reference
+        logs = [log for log in logs if log["user_id"]]
+        monthly = [
+            row for row in monthly
+            if row["user_id"] not in (ANONYMOUS_TENANT_ID, UNKNOWN_KEY_TENANT_ID)
+        ]
+
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(
+                    "INSERT INTO public.usage_logs (user_id, api_key_id, request_type, url, "
+                    "status_code, execution_time_ms, response_bytes, created_at) "
+                    "VALUES ($1, $2, $3, $4, $5, $6, $7, $8::timestamptz)",
+                    [
+                        (
+                            log["user_id"], log["api_key_id"], log["request_type"], log["url"],
+                            log["status_code"], log["execution_time_ms"], log["response_bytes"],
+                            datetime.fromisoformat(log["created_at"]),
+                        )
+                        for log in logs
+                    ],
+                )
+                await conn.executemany(
+                    "INSERT INTO public.monthly_usage (user_id, year_month, request_count, "
+                    "success_count, failed_count, total_execution_time_ms) "
+                    "VALUES ($1, $2, $3, $4, $5, $6) "
+                    "ON CONFLICT (user_id, year_month) DO UPDATE SET "
+                    "request_count = monthly_usage.request_count + EXCLUDED.request_count, "
+                    "success_count = monthly_usage.success_count + EXCLUDED.success_count, "
+                    "failed_count = monthly_usage.failed_count + EXCLUDED.failed_count, "
+                    "total_execution_time_ms = monthly_usage.total_execution_time_ms "
+                    "+ EXCLUDED.total_execution_time_ms",
+                    [
+                        (
+                            row["user_id"], row["year_month"], row["request_count"],
+                            row["success_count"], row["failed_count"],
+                            row["total_execution_time_ms"],
+                        )
+                        for row in monthly
+                    ],
+                )
+
+    async def close(self) -> None:
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+
+def create_backend(database_url: str):
+    """Pick a usage backend from a database URL."""
+    if database_url.startswith("sqlite:///"):
+        return SQLiteUsageBackend(database_url[len("sqlite:///"):])
+    if database_url.startswith(("postgres://", "postgresql://")):
+        try:
+            import asyncpg  # noqa: F401
+        except ImportError:
+            raise ValueError(f"Usage database URL {database_url.split('://')[0]}:// needs asyncpg") from None
+        return PostgresUsageBackend(database_url)
+    raise ValueError(f"Unsupported usage database URL: {database_url}")
+
+
+class UsageRecorder:
+    """
+    Asynchronous write-behind usage recorder.
+    `record()` only appends to a bounded in-memory ring and bumps monthly
+    counters; a background task flushes both in bulk on a timer or once
+    the batch threshold is reached. Batches that cannot be written because
+    the database is unavailable are spilled to a JSON-lines file and
+    replayed on the next flush. A batch the database rejects (constraint
+    or data errors) is retried one user at a time, and only the users
+    whose rows still fail go to a dead-letter file, so one bad user never
+    holds up everyone else's usage.
+    """
+
+    def __init__(
+        self,
+        database_url: str = settings.usage_database_url,
+        buffer_size: int = settings.usage_buffer_size,
+        flush_interval_s: float = settings.usage_flush_interval_s,
+        flush_batch_size: int = settings.usage_flush_batch_size,
+        spill_path: str = settings.usage_spill_path,
+        dead_letter_path: str = settings.usage_dead_letter_path,
+    ):
+        self._database_url = database_url
+        self._buffer: deque[dict] = deque(maxlen=buffer_size)
+        self._monthly: dict[tuple[str, str], dict] = {}
+        self._flush_interval = flush_interval_s
+        self._flush_batch_size = flush_batch_size
+        self._spill_path = Path(spill_path)
+        self._dead_letter_path = Path(dead_letter_path)
+        self._backend = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stats = {"recorded": 0, "dropped": 0, "flushed": 0, "spilled": 0, "dead_lettered": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None
+
+    @property
+    def stats(self) -> dict:
+        return {**self._stats, "buffered": len(self._buffer)}
+
+    async def start(self) -> None:
+        """Connect the backend and start the flush loop."""
+        if not self._database_url:
+            logger.info("Usage recording disabled (no USAGE_DATABASE_URL)")
+            return
+        self._backend = create_backend(self._database_url)
+        try:
+            await self._backend.connect()
+        except Exception as e:
+            # Keep recording; batches spill to disk until the database is back
+            logger.error(f"Usage database unavailable, spilling to disk: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._backend:
+            await self.flush()
+            await self._backend.close()
+
+    def record(
+        self,
+        tenant: Tenant,
+        action: str,
+        url: str,
+        status_code: int,
+        response_bytes: int,
+        execution_time_ms: float,
+    ) -> None:
+        """Buffer one request's usage (non-blocking)."""
+        if not self.enabled:
+            return
+
+        now = datetime.now(timezone.utc)
+        if len(self._buffer) == self._buffer.maxlen:
+            self._stats["dropped"] += 1
+        self._buffer.append({
+            "user_id": tenant.user_id,
+            "api_key_id": tenant.id if tenant.user_id else None,
+            "request_type": action,
+            "url": url,
+            "status_code": status_code,
+            "execution_time_ms": execution_time_ms,
+            "response_bytes": response_bytes,
+            "created_at": now.isoformat(),
+        })
+        self._stats["recorded"] += 1
+
+        # Monthly counters are aggregated in memory, so they stay exact
+        # even if the ring overflows before a flush
+        key = (tenant.user_id or tenant.id, now.strftime("%Y-%m"))
+        counters = self._monthly.get(key)
+        if counters is None:
+            counters = self._monthly[key] = {
+                "user_id": key[0],
+                "year_month": key[1],
+                "request_count": 0,
+                "success_count": 0,
+                "failed_count": 0,
+                "total_execution_time_ms": 0.0,
+            }
+        counters["request_count"] += 1
+        if 200 <= status_code < 300:
+            counters["success_count"] += 1
+        elif status_code >= 400:
+            counters["failed_count"] += 1
+        counters["total_execution_time_ms"] += execution_time_ms
+
+        if len(self._buffer) >= self._flush_batch_size:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Usage flush failed: {e}")
+
+    async def flush(self) -> None:
+        """Write buffered records and monthly deltas in one batch."""
+        async with self._flush_lock:
+            logs = list(self._buffer)
+            self._buffer.clear()
+            monthly = list(self._monthly.values())
+            self._monthly = {}
+
+            if self._spill_path.exists() and not await self._replay_spill():
+                if logs or monthly:
+                    self._spill(logs, monthly)
+                return
+
+            if not logs and not monthly:
+                return
+            unwritten = await self._write_batch({"logs": logs, "monthly": monthly})
+            if unwritten:
+                self._spill(unwritten["logs"], unwritten["monthly"])
+
+    def _is_transient(self, error: Exception) -> bool:
+        """Errors that cannot be classified count as transient, so records are never dropped."""
+        try:
+            return self._backend.is_transient(error)
+        except Exception as e:
+            logger.warning(f"Could not classify usage write error {error!r}: {e}")
+            return True
+
+    async def _write_batch(self, batch: dict) -> Optional[dict]:
+        """
+        Write a batch; returns what is left unwritten because the database
+        is unavailable (None when done). If the database rejects the batch,
+        it is retried per user and only the failing users are dead-lettered.
+        """
+        try:
+            await self._write(batch["logs"], batch["monthly"])
+            return None
+        except Exception as e:
+            if self._is_transient(e):
+                logger.warning(f"Usage write failed, spilling {len(batch['logs'])} records: {e}")
+                return batch
+            logger.warning(f"Usage batch rejected, retrying per user: {e}")
+
+        groups = self._group_by_user(batch)
+        for i, group in enumerate(groups):
+            try:
+                await self._write(group["logs"], group["monthly"])
+            except Exception as e:
+                if self._is_transient(e):
+                    logger.warning(f"Usage write failed, spilling the remaining users: {e}")
+                    rest = groups[i:]
+                    return {
+                        "logs": [log for g in rest for log in g["logs"]],
+                        "monthly": [row for g in rest for row in g["monthly"]],
+                    }
+                self._dead_letter(group, e)
+        return None
+
+    @staticmethod
+    def _group_by_user(batch: dict) -> list[dict]:
+        groups: dict[Optional[str], dict] = {}
+        for log in batch["logs"]:
+            groups.setdefault(log["user_id"], {"logs": [], "monthly": []})["logs"].append(log)
+        for row in batch["monthly"]:
+            groups.setdefault(row["user_id"], {"logs": [], "monthly": []})["monthly"].append(row)
+        return list(groups.values())
+
+    async def _write(self, logs: list[dict], monthly: list[dict]) -> None:
+        if not self._backend.connected:
+            await self._backend.connect()
+        await self._backend.write(logs, monthly)
+        self._stats["flushed"] += len(logs)
+
+    def _spill(self, logs: list[dict], monthly: list[dict]) -> None:
+        self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._spill_path.open("a") as f:
+            f.write(json.dumps({"logs": logs, "monthly": monthly}) + "\n")
+        self._stats["spilled"] += len(logs)
+
+    def _dead_letter(self, batch: dict, error: Exception) -> None:
+        logger.error(
+            f"Usage records rejected ({len(batch['logs'])} logs, {len(batch['monthly'])} "
+            f"monthly rows), moving them to {self._dead_letter_path}: {error}"
+        )
+        self._dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._dead_letter_path.open("a") as f:
+            f.write(json.dumps({**batch, "error": f"{type(error).__name__}: {error}"}) + "\n")
+        self._stats["dead_lettered"] += len(batch["logs"])
+
+    async def _replay_spill(self) -> bool:
+        """Write spilled batches back to the database; True if fully drained."""
+        batches = [
+            json.loads(line)
+            for line in self._spill_path.read_text().splitlines()
+            if line.strip()
+        ]
+        for i, batch in enumerate(batches):
+            unwritten = await self._write_batch(batch)
+            if unwritten:
+                logger.warning("Usage database still unavailable")
+                remaining = [unwritten, *batches[i + 1:]]
+                self._spill_path.write_text(
+                    "".join(json.dumps(b) + "\n" for b in remaining)
+                )
+                return False
+        self._spill_path.unlink()
+        logger.info(f"Replayed {len(batches)} spilled usage batches")
+        return True
+
+
+# Global usage recorder instance
+usage_recorder = UsageRecorder()
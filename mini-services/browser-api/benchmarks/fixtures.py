@@ -0,0 +1,143 @@
+"""
+Local fixture site for benchmarks.
+
+Serves deterministic pages that exercise different browser workloads:
+
+- ``/static``          small static HTML page
+- ``/js-heavy``        page that builds its content with a CPU-bound script
+- ``/slow``            response delayed by ``?delay_ms=`` (default 1500)
+- ``/huge-dom``        page with ``?nodes=`` elements (default 20000)
+- ``/redirect``        chain of ``?hops=`` 302 redirects ending at ``/static``
+
+Run standalone with ``python -m benchmarks.fixtures --port 8900``.
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STATIC_PAGE = """<!DOCTYPE html>
+<html><head><title>Static Fixture</title></head>
+<body><h1>Static fixture</h1>{paragraphs}</body></html>
+"""
+
+JS_HEAVY_PAGE = """<!DOCTYPE html>
+<html><head><title>JS Heavy Fixture</title></head>
+<body><div id="app">loading</div>
+<script>
+  let acc = 0;
+  for (let i = 0; i < {iterations}; i++) {{ acc = (acc + Math.sqrt(i) * 31) % 1000003; }}
+  const app = document.getElementById('app');
+  app.innerHTML = '';
+  for (let i = 0; i < 500; i++) {{
+    const el = document.createElement('p');
+    el.textContent = 'item ' + i + ' ' + acc;
+    app.appendChild(el);
+  }}
+  app.setAttribute('data-ready', '1');
+</script></body></html>
+"""
+
+HUGE_DOM_PAGE = """<!DOCTYPE html>
+<html><head><title>Huge DOM Fixture</title></head>
+<body><table>{rows}</table></body></html>
+"""
+
+PAGES = ("static", "js-heavy", "slow", "huge-dom", "redirect")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Request handler for the fixture pages."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_html(self, body: str) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        if parsed.path == "/static":
+            self._send_html(STATIC_PAGE.format(paragraphs="<p>Lorem ipsum dolor sit amet.</p>" * 20))
+
+        elif parsed.path == "/js-heavy":
+            self._send_html(JS_HEAVY_PAGE.format(iterations=int(query.get("iterations", 5_000_000))))
+
+        elif parsed.path == "/slow":
+            time.sleep(int(query.get("delay_ms", 1500)) / 1000)
+            self._send_html(STATIC_PAGE.format(paragraphs="<p>Slow response.</p>"))
+
+        elif parsed.path == "/huge-dom":
+            nodes = int(query.get("nodes", 20000))
+            rows = "".join(f"<tr><td>{i}</td><td>row {i}</td></tr>" for i in range(nodes // 2))
+            self._send_html(HUGE_DOM_PAGE.format(rows=rows))
+
+        elif parsed.path == "/redirect":
+            hops = int(query.get("hops", 5))
+            self.send_response(302)
+            self.send_header("Location", f"/redirect?hops={hops - 1}" if hops > 1 else "/static")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        else:
+            self.send_error(404)
+
+
+class FixtureServer:
+    """Fixture HTTP server running on a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), FixtureHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, page: str) -> str:
+        return f"{self.base_url}/{page}"
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve benchmark fixture pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+
+    server = FixtureServer(args.host, args.port)
+    print(f"Serving fixtures at {server.base_url}: {', '.join(PAGES)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Browser API load test and benchmark runner.
+
+Starts the local fixture site, drives the running service at a fixed
+concurrency and reports throughput, latency percentiles, error rate and
+peak Python/Chromium RSS per scenario. Results are written as JSON and
+can be compared against a previous run to gate regressions.
+
+The service must be allowed to reach the fixture host, and per-domain
+politeness should be relaxed since every fixture page shares one host::
+
+    SSRF_ALLOWED_HOSTS=127.0.0.1 DOMAIN_MIN_INTERVAL_MS=0 DOMAIN_MAX_CONCURRENCY=3 \\
+        uvicorn app.main:app --port 8000
+
+    python -m benchmarks.run --base-url http://localhost:8000 \\
+        --concurrency 3 --requests 30 --output results.json \\
+        --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from .fixtures import PAGES, FixtureServer
+
+ACTIONS = ("render", "screenshot", "pdf")
+ENDPOINTS = ("browse", "quick")
+QUICK_PATHS = {"render": "/api/v1/render", "screenshot": "/api/v1/screenshot", "pdf": "/api/v1/pdf"}
+
+# Regression thresholds used by --baseline
+MAX_THROUGHPUT_DROP = 0.10
+MAX_P95_INCREASE = 0.15
+MAX_ERROR_RATE_INCREASE = 0.02
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class MemorySampler:
+    """Polls /api/v1/health and keeps peak Python and Chromium RSS."""
+
+    def __init__(self, client: httpx.AsyncClient, interval_s: float = 0.25):
+        self._client = client
+        self._interval = interval_s
+        self.peak_python_mb: Optional[float] = None
+        self.peak_browser_mb: Optional[float] = None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                health = (await self._client.get("/api/v1/health")).json()
+                python_mb = health.get("memory_usage_mb")
+                browser_mb = health.get("browser_memory_usage_mb")
+                if python_mb is not None:
+                    self.peak_python_mb = max(self.peak_python_mb or 0.0, python_mb)
+                if browser_mb is not None:
+                    self.peak_browser_mb = max(self.peak_browser_mb or 0.0, browser_mb)
+            except (httpx.HTTPError, ValueError):
+                pass
+            await asyncio.sleep(self._interval)
+
+
+async def _send(client: httpx.AsyncClient, endpoint: str, action: str, url: str, timeout_ms: int):
+    if endpoint == "browse":
+        return await client.post(
+            "/api/v1/browse",
+            json={"url": url, "action": action, "timeout": timeout_ms},
+        )
+    return await client.post(QUICK_PATHS[action], params={"url": url})
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    fixtures: FixtureServer,
+    endpoint: str,
+    action: str,
+    pages: list[str],
+    concurrency: int,
+    total_requests: int,
+    timeout_ms: int,
+) -> dict:
+    """Drive one endpoint/action pair and summarize the results."""
+    latencies: dict[str, list[float]] = {page: [] for page in pages}
+    errors: dict[str, int] = {page: 0 for page in pages}
+    status_codes: dict[str, int] = {}
+    counter = iter(range(total_requests))
+
+    async def worker() -> None:
+        for i in counter:
+            page = pages[i % len(pages)]
+            start = time.perf_counter()
+            try:
+                response = await _send(client, endpoint, action, fixtures.url(page), timeout_ms)
+                code = str(response.status_code)
+                ok = response.status_code == 200
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+                ok = False
+            status_codes[code] = status_codes.get(code, 0) + 1
+            if ok:
+                latencies[page].append((time.perf_counter() - start) * 1000)
+            else:
+                errors[page] += 1
+
+    sampler = MemorySampler(client)
+    sampler_task = asyncio.create_task(sampler.run())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    sampler_task.cancel()
+
+    def summarize(samples: list[float], failed: int) -> dict:
+        count = len(samples) + failed
+        return {
+            "requests": count,
+            "errors": failed,
+            "error_rate": failed / count if count else 0.0,
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "mean_ms": statistics.fmean(samples) if samples else 0.0,
+        }
+
+    all_latencies = [ms for samples in latencies.values() for ms in samples]
+    return {
+        **summarize(all_latencies, sum(errors.values())),
+        "duration_s": elapsed,
+        "throughput_rps": len(all_latencies) / elapsed if elapsed else 0.0,
+        "peak_python_rss_mb": sampler.peak_python_mb,
+        "peak_browser_rss_mb": sampler.peak_browser_mb,
+        "status_codes": status_codes,
+        "pages": {page: summarize(latencies[page], errors[page]) for page in pages},
+    }
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """Return regressions of `current` against `baseline`."""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if base["throughput_rps"] and (
+            result["throughput_rps"] < base["throughput_rps"] * (1 - MAX_THROUGHPUT_DROP)
+        ):
+            regressions.append(
+                f"{name}: throughput {result['throughput_rps']:.2f} rps "
+                f"< baseline {base['throughput_rps']:.2f} rps"
+            )
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + MAX_P95_INCREASE):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.0f} ms > baseline {base['p95_ms']:.0f} ms"
+            )
+        if result["error_rate"] > base["error_rate"] + MAX_ERROR_RATE_INCREASE:
+            regressions.append(
+                f"{name}: error rate {result['error_rate']:.1%} "
+                f"> baseline {base['error_rate']:.1%}"
+            )
+    return regressions
+
+
+def print_report(results: dict) -> None:
+    header = f"{'scenario':<20}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'err%':>7}{'py MB':>8}{'chr MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results["scenarios"].items():
+        py_mb = f"{r['peak_python_rss_mb']:.0f}" if r["peak_python_rss_mb"] is not None else "-"
+        chr_mb = f"{r['peak_browser_rss_mb']:.0f}" if r["peak_browser_rss_mb"] is not None else "-"
+        print(
+            f"{name:<20}{r['throughput_rps']:>8.2f}{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}"
+            f"{r['p99_ms']:>9.0f}{r['error_rate'] * 100:>7.1f}{py_mb:>8}{chr_mb:>8}"
+        )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "pages": args.pages,
+            "python": platform.python_version(),
+        },
+        "scenarios": {},
+    }
+
+    with FixtureServer(args.fixture_host, args.fixture_port) as fixtures:
+        timeout = httpx.Timeout(args.timeout / 1000 + 30)
+        limits = httpx.Limits(max_connections=args.concurrency + 2)
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+            # Warm-up request so the first scenario does not pay browser launch
+            await _send(client, "browse", "render", fixtures.url("static"), args.timeout)
+
+            for endpoint in args.endpoints:
+                for action in args.actions:
+                    name = f"{endpoint}:{action}"
+                    print(f"Running {name} ...", file=sys.stderr)
+                    results["scenarios"][name] = await run_scenario(
+                        client, fixtures, endpoint, action, args.pages,
+                        args.concurrency, args.requests, args.timeout,
+                    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Browser API service")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=30, help="Requests per scenario")
+    parser.add_argument("--timeout", type=int, default=30000, help="Per-request timeout in ms")
+    parser.add_argument("--actions", nargs="+", choices=ACTIONS, default=list(ACTIONS))
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--pages", nargs="+", choices=PAGES, default=list(PAGES))
+    parser.add_argument("--fixture-host", default="127.0.0.1")
+    parser.add_argument("--fixture-port", type=int, default=0)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous results JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f))
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -114,6 +114,7 @@ export interface Database {
           url: string
           status_code: number | null
           execution_time_ms: number | null
+          response_bytes: number | null
           created_at: string
         }
         Insert: {
@@ -124,6 +125,7 @@ export interface Database {
           url: string
           status_code?: number | null
           execution_time_ms?: number | null
+          response_bytes?: number | null
           created_at?: string
         }
         Update: {
@@ -134,6 +136,7 @@ export interface Database {
           url?: string
           status_code?: number | null
           execution_time_ms?: number | null
+          response_bytes?: number | null
           created_at?: string
         }
       }
@@ -84,6 +84,7 @@ CREATE TABLE IF NOT EXISTS usage_logs (
     url TEXT NOT NULL,
     status_code INTEGER,
     execution_time_ms INTEGER,
+    response_bytes BIGINT,
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
@@ -58,6 +58,7 @@ CREATE TABLE public.usage_logs (
   url TEXT NOT NULL,
   status_code INTEGER,
   execution_time_ms FLOAT,
+  response_bytes BIGINT,
   created_at TIMESTAMPTZ DEFAULT NOW()
 );
 